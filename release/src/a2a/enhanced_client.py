@@ -4,10 +4,11 @@
 """
 
 import asyncio
+import heapq
 import json
 import logging
 import uuid
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
@@ -44,6 +45,58 @@ class MessageQueueItem:
     callback: Optional[Callable] = None
 
 
+class MessageQueue:
+    """
+    消息优先级队列
+    
+    基于 heapq 的列表堆加一个 asyncio.Event 实现，入队只需一次堆插入和事件置位，
+    没有 asyncio.PriorityQueue 的条件变量和等待者簿记。
+    优先级数值越大越先出队，同优先级按入队顺序出队（序号参与比较，消息队列项本身不参与比较）。
+    """
+    
+    def __init__(self):
+        self._heap: List[Tuple[int, int, MessageQueueItem]] = []
+        self._seq = 0
+        # 在首次等待时创建，确保绑定到实际运行的事件循环
+        self._not_empty: Optional[asyncio.Event] = None
+    
+    def put_nowait(self, entry: Tuple[int, MessageQueueItem]):
+        """入队 (优先级, 消息队列项)"""
+        priority, queue_item = entry
+        heapq.heappush(self._heap, (-priority, self._seq, queue_item))
+        self._seq += 1
+        if self._not_empty is not None:
+            self._not_empty.set()
+    
+    async def put(self, entry: Tuple[int, MessageQueueItem]):
+        """入队 (优先级, 消息队列项)，队列无容量上限，不会等待"""
+        self.put_nowait(entry)
+    
+    def get_nowait(self) -> Tuple[int, MessageQueueItem]:
+        """取出优先级最高的 (优先级, 消息队列项)，队列为空时抛出 asyncio.QueueEmpty"""
+        if not self._heap:
+            raise asyncio.QueueEmpty
+        neg_priority, _, queue_item = heapq.heappop(self._heap)
+        return -neg_priority, queue_item
+    
+    async def get(self) -> Tuple[int, MessageQueueItem]:
+        """取出优先级最高的 (优先级, 消息队列项)，队列为空时等待入队"""
+        while not self._heap:
+            if self._not_empty is None:
+                self._not_empty = asyncio.Event()
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+    
+    def qsize(self) -> int:
+        """队列中的消息数"""
+        return len(self._heap)
+    
+    def empty(self) -> bool:
+        """队列是否为空"""
+        return not self._heap
+
+
 @dataclass
 class ConnectionStats:
     """连接统计"""
@@ -75,7 +128,8 @@ class EnhancedA2AClient:
         self.connection_stats = ConnectionStats()
         
         # 消息队列
-        self.message_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.message_queue = MessageQueue()
+        self.max_batch_size = 64  # 消息处理循环每批最多处理的消息数
         self.pending_responses: Dict[str, asyncio.Future] = {}
         
         # 消息处理器
@@ -148,10 +202,7 @@ class EnhancedA2AClient:
             
             # 清空消息队列
             while not self.message_queue.empty():
-                try:
-                    self.message_queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    break
+                self.message_queue.get_nowait()
             
             self.logger.info("A2A客户端已断开连接")
             
@@ -176,7 +227,7 @@ class EnhancedA2AClient:
             
             # 添加到消息队列
             priority_value = priority.value
-            await self.message_queue.put((priority_value, queue_item))
+            self.message_queue.put_nowait((priority_value, queue_item))
             
             self.logger.info(f"消息已加入队列: {message.message_type} (优先级: {priority.name})")
             return message.message_id
@@ -189,8 +240,8 @@ class EnhancedA2AClient:
                                    timeout: int = 30) -> Optional[AgentMessage]:
         """发送消息并等待响应"""
         try:
-            # 创建响应Future
-            response_future = asyncio.Future()
+            # 创建响应Future（由当前事件循环创建，使用循环的原生Future实现）
+            response_future = asyncio.get_running_loop().create_future()
             self.pending_responses[message.message_id] = response_future
             
             # 发送消息
@@ -204,28 +255,26 @@ class EnhancedA2AClient:
                 self.logger.warning(f"等待消息响应超时: {message.message_id}")
                 return None
             finally:
-                # 清理pending_responses
-                if message.message_id in self.pending_responses:
-                    del self.pending_responses[message.message_id]
+                # 清理pending_responses（收到响应时已由 receive_message 移除）
+                self.pending_responses.pop(message.message_id, None)
                     
         except Exception as e:
             self.logger.error(f"发送消息并等待响应失败: {str(e)}")
-            if message.message_id in self.pending_responses:
-                del self.pending_responses[message.message_id]
+            self.pending_responses.pop(message.message_id, None)
             raise
     
     async def _message_processing_loop(self):
         """消息处理循环"""
         while self.connection_status == ConnectionStatus.CONNECTED:
             try:
-                # 从队列获取消息
+                # 阻塞等待第一条消息，再不等待地取出已排队的消息，凑成一批
                 priority, queue_item = await self.message_queue.get()
+                batch = [queue_item]
+                while len(batch) < self.max_batch_size and not self.message_queue.empty():
+                    batch.append(self.message_queue.get_nowait()[1])
                 
-                # 处理消息
-                await self._process_message_queue_item(queue_item)
-                
-                # 标记任务完成
-                self.message_queue.task_done()
+                # 并发处理整批消息（各消息的错误和重试在 _process_message_queue_item 内处理）
+                await asyncio.gather(*(self._process_message_queue_item(item) for item in batch))
                 
             except asyncio.CancelledError:
                 break
@@ -259,7 +308,7 @@ class EnhancedA2AClient:
             if queue_item.retry_count < queue_item.max_retries:
                 # 重新加入队列
                 priority_value = queue_item.priority.value
-                await self.message_queue.put((priority_value, queue_item))
+                self.message_queue.put_nowait((priority_value, queue_item))
                 self.logger.info(f"消息重试: {queue_item.message.message_id} (重试次数: {queue_item.retry_count})")
             else:
                 self.connection_stats.failed_messages += 1
@@ -294,11 +343,10 @@ class EnhancedA2AClient:
         try:
             self.connection_stats.total_messages_received += 1
             
-            # 检查是否是等待的响应
-            if message.correlation_id and message.correlation_id in self.pending_responses:
-                future = self.pending_responses[message.correlation_id]
-                if not future.done():
-                    future.set_result(message)
+            # 检查是否是等待的响应（一次字典操作完成查找和移除）
+            future = self.pending_responses.pop(message.correlation_id, None) if message.correlation_id else None
+            if future is not None and not future.done():
+                future.set_result(message)
             
             # 调用消息处理器
             handler = self.message_handlers.get(message.message_type)
@@ -5,7 +5,7 @@
 
 import asyncio
 import time
-from typing import Dict, Any, List, Optional, Set, Callable
+from typing import Dict, Any, List, Optional, Set, Callable, Awaitable
 from dataclasses import dataclass, field
 import json
 import uuid
@@ -56,6 +56,19 @@ class DiscoveryTask:
     created_time: float = field(default_factory=time.time)
     updated_time: float = field(default_factory=time.time)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # 执行该任务的asyncio.Task，作为任务结束（完成/失败/取消）的唯一信号，同时避免其被垃圾回收
+    _task_handle: Optional[asyncio.Task] = field(default=None, repr=False, compare=False)
+    
+    @property
+    def completion(self) -> Awaitable[None]:
+        """等待任务执行结束；未经事件循环调度的任务视为已结束"""
+        return _wait_task_handle(self._task_handle)
+
+
+async def _wait_task_handle(handle: Optional[asyncio.Task]) -> None:
+    """等待执行任务结束；任务被取消时正常返回，等待方被取消时不影响执行任务"""
+    if handle is not None:
+        await asyncio.wait({handle})
 
 
 class CapabilityDiscovery:
@@ -95,7 +108,7 @@ class CapabilityDiscovery:
         log_info(f"开始发现模型能力: {model_id} (任务ID: {task_id})")
         
         # 异步执行发现任务
-        asyncio.create_task(self._execute_discovery_task(task))
+        task._task_handle = asyncio.create_task(self._execute_discovery_task(task))
         
         return task_id
     
@@ -658,6 +671,8 @@ class CapabilityDiscovery:
         if task and task.status in [DiscoveryStatus.PENDING, DiscoveryStatus.RUNNING]:
             task.status = DiscoveryStatus.CANCELLED
             task.updated_time = time.time()
+            if task._task_handle is not None:
+                task._task_handle.cancel()
             log_info(f"取消发现任务: {task_id}")
             return True
         return False
@@ -707,10 +722,10 @@ async def test_capability_discovery():
         task_id = await discovery.discover_model_capabilities("test_model")
         
         # 等待任务完成
-        await asyncio.sleep(0.1)
+        task = discovery.get_task_status(task_id)
+        await asyncio.wait_for(task.completion, timeout=1.0)
         
         # 检查任务状态
-        task = discovery.get_task_status(task_id)
         assert task is not None
         assert task.status == DiscoveryStatus.COMPLETED
         
@@ -4,6 +4,7 @@
 """
 
 import asyncio
+import math
 import time
 import statistics
 from typing import Dict, List, Optional, Set, Any, Tuple
@@ -90,6 +91,40 @@ class PerformanceMetrics:
     cost_efficiency_score: float
 
 
+@dataclass
+class _MetricsAccumulator:
+    """性能指标汇总量（批量更新时按能力和模型累加）"""
+    total_tests: int = 0
+    successful_tests: int = 0
+    response_time_sum: float = 0.0
+    response_time_sq_sum: float = 0.0
+    total_cost: float = 0.0
+    min_response_time: float = math.inf
+    max_response_time: float = -math.inf
+    
+    def add(self, successful_tests: int, avg_response_time: float,
+            total_cost: float, total_tests: int):
+        """累加一条记录，响应时间按测试数加权"""
+        self.total_tests += total_tests
+        self.successful_tests += successful_tests
+        self.response_time_sum += avg_response_time * total_tests
+        self.response_time_sq_sum += avg_response_time * avg_response_time * total_tests
+        self.total_cost += total_cost
+        self.min_response_time = min(self.min_response_time, avg_response_time)
+        self.max_response_time = max(self.max_response_time, avg_response_time)
+    
+    def merge(self, metrics: PerformanceMetrics):
+        """合并已有指标，由均值和标准差还原平方和"""
+        n = metrics.total_tests
+        self.total_tests += n
+        self.successful_tests += metrics.successful_tests
+        self.response_time_sum += metrics.avg_response_time * n
+        self.response_time_sq_sum += (metrics.std_response_time ** 2 + metrics.avg_response_time ** 2) * n
+        self.total_cost += metrics.total_cost
+        self.min_response_time = min(self.min_response_time, metrics.min_response_time)
+        self.max_response_time = max(self.max_response_time, metrics.max_response_time)
+
+
 class CapabilityTestOptimizer:
     """能力测试优化器"""
     
@@ -599,50 +634,69 @@ class CapabilityTestOptimizer:
                                   avg_response_time: float, total_cost: float,
                                   total_tests: int):
         """更新性能指标"""
-        metrics_key = f"{capability_id}_{model_id}"
+        self._batch_update_performance_metrics([
+            (capability_id, model_id, successful_tests, failed_tests,
+             avg_response_time, total_cost, total_tests)
+        ])
+    
+    def _batch_update_performance_metrics(self, records: List[Tuple[str, str, int, int, float, float, int]]):
+        """
+        批量更新性能指标
         
-        success_rate = successful_tests / total_tests if total_tests > 0 else 0.0
+        先按能力和模型汇总全部记录的统计量，再为每个组合写入一次指标，
+        避免逐条写入时反复重算派生字段。标准差按各记录的平均响应时间
+        （以测试数加权）重新计算。
         
-        if metrics_key in self.performance_metrics:
-            # 更新现有指标
-            metrics = self.performance_metrics[metrics_key]
-            old_total = metrics.total_tests
+        Args:
+            records: 记录列表，每条记录的字段与 _update_performance_metrics 的参数顺序一致：
+                (capability_id, model_id, successful_tests, failed_tests,
+                 avg_response_time, total_cost, total_tests)
+        """
+        # 汇总各组合的充分统计量
+        totals: Dict[Tuple[str, str], _MetricsAccumulator] = {}
+        for (capability_id, model_id, successful_tests, failed_tests,
+             avg_response_time, total_cost, total_tests) in records:
+            entry = totals.get((capability_id, model_id))
+            if entry is None:
+                entry = totals[(capability_id, model_id)] = _MetricsAccumulator()
+            entry.add(successful_tests, avg_response_time, total_cost, total_tests)
+        
+        now = time.time()
+        for (capability_id, model_id), entry in totals.items():
+            metrics_key = f"{capability_id}_{model_id}"
             
-            # 合并统计信息
-            metrics.total_tests += total_tests
-            metrics.successful_tests += successful_tests
-            metrics.success_rate = (metrics.success_rate * old_total + success_rate * total_tests) / metrics.total_tests
-            metrics.avg_response_time = (metrics.avg_response_time * old_total + avg_response_time * total_tests) / metrics.total_tests
-            metrics.total_cost += total_cost
-            metrics.avg_cost_per_test = metrics.total_cost / metrics.total_tests
-            metrics.last_test_time = time.time()
+            # 合并已有指标
+            existing = self.performance_metrics.get(metrics_key)
+            if existing is not None:
+                entry.merge(existing)
             
-            # 更新分数
-            metrics.reliability_score = metrics.success_rate
-            metrics.performance_score = max(0, 1 - (metrics.avg_response_time / self.config.performance_threshold))
-            metrics.cost_efficiency_score = max(0, 1 - (metrics.avg_cost_per_test / self.config.cost_threshold))
+            total_tests = entry.total_tests
+            if total_tests > 0:
+                success_rate = entry.successful_tests / total_tests
+                avg_response_time = entry.response_time_sum / total_tests
+                avg_cost_per_test = entry.total_cost / total_tests
+                variance = entry.response_time_sq_sum / total_tests - avg_response_time ** 2
+                std_response_time = math.sqrt(max(variance, 0.0))
+            else:
+                success_rate = avg_response_time = avg_cost_per_test = std_response_time = 0.0
             
-        else:
-            # 创建新指标
-            metrics = PerformanceMetrics(
+            self.performance_metrics[metrics_key] = PerformanceMetrics(
                 capability_id=capability_id,
                 model_id=model_id,
                 total_tests=total_tests,
-                successful_tests=successful_tests,
+                successful_tests=entry.successful_tests,
                 success_rate=success_rate,
                 avg_response_time=avg_response_time,
-                min_response_time=avg_response_time,
-                max_response_time=avg_response_time,
-                std_response_time=0.0,
-                total_cost=total_cost,
-                avg_cost_per_test=total_cost / total_tests if total_tests > 0 else 0.0,
-                last_test_time=time.time(),
+                min_response_time=entry.min_response_time,
+                max_response_time=entry.max_response_time,
+                std_response_time=std_response_time,
+                total_cost=entry.total_cost,
+                avg_cost_per_test=avg_cost_per_test,
+                last_test_time=now,
                 reliability_score=success_rate,
                 performance_score=max(0, 1 - (avg_response_time / self.config.performance_threshold)),
-                cost_efficiency_score=max(0, 1 - ((total_cost / total_tests) / self.config.cost_threshold) if total_tests > 0 else 1.0)
+                cost_efficiency_score=max(0, 1 - (avg_cost_per_test / self.config.cost_threshold))
             )
-        
-        self.performance_metrics[metrics_key] = metrics
     
     def get_performance_metrics(self, capability_id: str, model_id: str) -> Optional[PerformanceMetrics]:
         """获取性能指标"""
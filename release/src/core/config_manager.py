@@ -12,6 +12,10 @@ import logging
 
 from .config_model import ConfigModel
 
+# 优先使用libyaml的C实现，未安装时回退到纯Python实现
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 class ConfigManager:
     """配置管理器类"""
@@ -69,7 +73,7 @@ class ConfigManager:
                 return self.create_default_config()
             
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                config_dict = yaml.safe_load(f)
+                config_dict = yaml.load(f, Loader=_YAML_LOADER)
             
             if config_dict is None:
                 raise ValueError("配置文件为空")
@@ -121,7 +125,7 @@ class ConfigManager:
             config_dict = config.to_dict()
             
             with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config_dict, f, default_flow_style=False, 
+                yaml.dump(config_dict, f, Dumper=_YAML_DUMPER, default_flow_style=False, 
                          allow_unicode=True, indent=2)
             
             self._config = config
@@ -5,6 +5,7 @@
 
 import sqlite3
 import os
+import queue
 import logging
 from pathlib import Path
 from typing import Optional, List, Dict, Any
@@ -19,7 +20,8 @@ class DatabaseManager:
         初始化数据库管理器
         
         Args:
-            db_path: 数据库文件路径，如果为None则使用默认路径
+            db_path: 数据库文件路径，如果为None则使用默认路径；
+                也可以是 ":memory:" 或 "file:名称?mode=memory&cache=shared" 形式的内存数据库URI
         """
         if db_path is None:
             # 使用默认数据库路径
@@ -29,10 +31,23 @@ class DatabaseManager:
             self.db_path = Path(db_path)
         
         self.connection: Optional[sqlite3.Connection] = None
+        self._reader_pool: Optional["queue.Queue[sqlite3.Connection]"] = None
+        self._reader_connections: List[sqlite3.Connection] = []
         self._logger = self._setup_logger()
         
-        # 确保数据库目录存在
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 内存数据库不对应磁盘文件，无需创建目录
+        if not self.is_memory_database:
+            # 确保数据库目录存在；无法创建时不在构造阶段抛出，由 connect() 统一报告连接错误
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                self._logger.warning(f"无法创建数据库目录 {self.db_path.parent}: {e}")
+    
+    @property
+    def is_memory_database(self) -> bool:
+        """是否为内存数据库"""
+        path = str(self.db_path)
+        return path == ":memory:" or (path.startswith("file:") and "mode=memory" in path)
     
     def _setup_logger(self) -> logging.Logger:
         """设置日志记录器"""
@@ -57,17 +72,14 @@ class DatabaseManager:
         Raises:
             sqlite3.Error: 数据库连接错误
         """
+        # 已连接时复用现有连接
+        if self.connection is not None:
+            return self.connection
+        
         try:
-            self.connection = sqlite3.connect(
-                str(self.db_path),
-                timeout=30,
-                check_same_thread=False
-            )
+            self.connection = self._open_connection()
             
-            # 启用外键约束
-            self.connection.execute("PRAGMA foreign_keys = ON")
-            
-            # 设置WAL模式以提高并发性能
+            # 设置WAL模式以提高并发性能（写连接负责设置，持久保存在数据库文件中）
             self.connection.execute("PRAGMA journal_mode = WAL")
             
             self._logger.info(f"数据库连接成功: {self.db_path}")
@@ -77,13 +89,96 @@ class DatabaseManager:
             self._logger.error(f"数据库连接失败: {e}")
             raise
     
+    def _open_connection(self, isolation_level: Optional[str] = "") -> sqlite3.Connection:
+        """
+        打开一个新的数据库连接并应用连接级PRAGMA设置
+        
+        Args:
+            isolation_level: 事务隔离级别，None表示自动提交模式
+            
+        Returns:
+            SQLite连接对象
+        """
+        # 扩大每个连接的预编译语句缓存（默认128），重复执行的参数化SQL无需重新解析；
+        # 标准库不支持 SQLITE_PREPARE_PERSISTENT 标志，长期复用的语句由该缓存保留
+        connection = sqlite3.connect(
+            str(self.db_path),
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=isolation_level,
+            cached_statements=256,
+            uri=str(self.db_path).startswith("file:")
+        )
+        
+        # 启用外键约束
+        connection.execute("PRAGMA foreign_keys = ON")
+        
+        # WAL模式下NORMAL同步级别不会损坏数据库，且提交时无需每次fsync
+        connection.execute("PRAGMA synchronous = NORMAL")
+        
+        # 临时表和索引放在内存中，页缓存上限约64MB
+        connection.execute("PRAGMA temp_store = MEMORY")
+        connection.execute("PRAGMA cache_size = -64000")
+        
+        return connection
+    
+    def get_pool(self, readers: int = 2) -> "queue.Queue[sqlite3.Connection]":
+        """
+        获取读连接池
+        
+        写操作使用 self.connection，读连接只在首次调用时打开，之后重复使用，
+        避免每个读者都新建 DatabaseManager 并重新打开WAL/SHM文件。
+        
+        Args:
+            readers: 读连接数量（仅首次创建连接池时生效）
+            
+        Returns:
+            读连接队列，使用 get() 取出连接，用完后 put() 归还
+            
+        Raises:
+            ValueError: 数据库为 ":memory:"（每个连接各自打开一个私有的空数据库，读连接看不到写入的数据）
+        """
+        if str(self.db_path) == ":memory:":
+            raise ValueError(
+                '":memory:" 数据库不支持连接池，请使用 "file:名称?mode=memory&cache=shared" 形式的共享缓存URI'
+            )
+        
+        if self.connection is None:
+            self.connect()
+        
+        if self._reader_pool is None:
+            pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=readers)
+            for _ in range(readers):
+                # 读连接使用自动提交模式，不持有事务，不会阻塞写连接的检查点
+                pool.put_nowait(self._open_connection(isolation_level=None))
+            self._reader_pool = pool
+            self._reader_connections = list(pool.queue)
+        
+        return self._reader_pool
+    
     def disconnect(self):
         """断开数据库连接"""
+        # 关闭读连接池中的所有连接（包括尚未归还的连接）
+        for reader in self._reader_connections:
+            reader.close()
+        self._reader_connections = []
+        self._reader_pool = None
+        
         if self.connection:
             self.connection.close()
             self.connection = None
             self._logger.info("数据库连接已关闭")
     
+    def __enter__(self) -> 'DatabaseManager':
+        """进入上下文时连接数据库（连接时应用PRAGMA设置）"""
+        self.connect()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """退出上下文时断开数据库连接"""
+        self.disconnect()
+        return False
+    
     def initialize_database(self) -> bool:
         """
         初始化数据库表结构
@@ -348,25 +443,36 @@ class DatabaseManager:
             """
         ]
         
-        # 执行所有建表语句
-        for sql in tables_sql:
-            self.connection.execute(sql)
-        
-        # 创建索引
-        self._create_indexes()
+        # 建表和建索引语句合并为一个脚本，在单个事务中一次解析执行
+        script = ";\n".join(sql.strip() for sql in tables_sql + self._get_indexes_sql())
+        try:
+            self.connection.executescript(f"BEGIN;\n{script};\nCOMMIT;")
+        except sqlite3.Error:
+            # 脚本中途失败时事务仍处于打开状态，回滚已创建的部分
+            if self.connection.in_transaction:
+                self.connection.rollback()
+            raise
         
         # 记录数据库版本
         self._set_database_version(1)
     
-    def _create_indexes(self):
-        """创建数据库索引"""
-        indexes_sql = [
+    def _get_indexes_sql(self) -> List[str]:
+        """获取数据库索引的创建语句"""
+        return [
             "CREATE INDEX IF NOT EXISTS idx_models_type ON models(type)",
             "CREATE INDEX IF NOT EXISTS idx_models_enabled ON models(is_enabled)",
             "CREATE INDEX IF NOT EXISTS idx_capabilities_category ON capabilities(category)",
             "CREATE INDEX IF NOT EXISTS idx_capabilities_active ON capabilities(is_active)",
             "CREATE INDEX IF NOT EXISTS idx_agents_enabled ON agents(is_enabled)",
             "CREATE INDEX IF NOT EXISTS idx_agent_instances_status ON agent_instances(status)",
+            # 外键列索引，关联查询时按索引查找而非全表扫描
+            # （UNIQUE约束首列已有自动索引，如 agent_capabilities.agent_id，无需重复创建）
+            "CREATE INDEX IF NOT EXISTS idx_agent_instances_agent_id ON agent_instances(agent_id)",
+            "CREATE INDEX IF NOT EXISTS idx_agent_caps_cap_id ON agent_capabilities(capability_id)",
+            "CREATE INDEX IF NOT EXISTS idx_agent_models_model_id ON agent_models(model_id)",
+            "CREATE INDEX IF NOT EXISTS idx_model_caps_cap_id ON model_capabilities(capability_id)",
+            "CREATE INDEX IF NOT EXISTS idx_a2a_tasks_agent_id ON a2a_tasks(agent_id)",
+            "CREATE INDEX IF NOT EXISTS idx_a2a_tasks_cap_id ON a2a_tasks(capability_id)",
             "CREATE INDEX IF NOT EXISTS idx_a2a_tasks_status ON a2a_tasks(status)",
             "CREATE INDEX IF NOT EXISTS idx_a2a_tasks_priority ON a2a_tasks(priority)",
             "CREATE INDEX IF NOT EXISTS idx_a2a_messages_created ON a2a_messages(created_at)",
@@ -374,9 +480,6 @@ class DatabaseManager:
             "CREATE INDEX IF NOT EXISTS idx_test_results_date ON test_results(test_date)",
             "CREATE INDEX IF NOT EXISTS idx_audit_logs_created ON audit_logs(created_at)"
         ]
-        
-        for sql in indexes_sql:
-            self.connection.execute(sql)
     
     def _insert_initial_data(self):
         """插入初始数据"""
@@ -444,10 +547,12 @@ class DatabaseManager:
                 timestamp = self._get_timestamp()
                 backup_path = self.db_path.parent / f"backup_{timestamp}.db"
             
-            # 使用SQLite的备份API
+            # 使用SQLite的在线备份API，pages=-1 一次复制全部页面，不设置进度回调
             backup_conn = sqlite3.connect(str(backup_path))
-            self.connection.backup(backup_conn)
-            backup_conn.close()
+            try:
+                self.connection.backup(backup_conn, pages=-1)
+            finally:
+                backup_conn.close()
             
             self._logger.info(f"数据库备份成功: {backup_path}")
             return True
@@ -461,6 +566,23 @@ class DatabaseManager:
         from datetime import datetime
         return datetime.now().strftime("%Y%m%d_%H%M%S")
     
+    def test_connection(self) -> bool:
+        """
+        测试数据库连接是否可用
+        
+        Returns:
+            能否连接数据库并执行查询
+        """
+        try:
+            # 未连接（或已断开）时先建立连接，使用返回的连接对象而不是可能为None的属性
+            connection = self.connect()
+            connection.execute("SELECT 1").fetchone()
+            return True
+            
+        except sqlite3.Error as e:
+            self._logger.error(f"数据库连接测试失败: {e}")
+            return False
+    
     def execute_query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """
         执行查询语句
@@ -17,7 +17,7 @@ from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QThread
 from PyQt6.QtGui import QFont, QIcon
 
 from ..core.capability_model import (
-    Capability, CapabilityType, CapabilityStatus, CapabilityRegistry
+    Capability, CapabilityType, CapabilityStatus, CapabilityRegistry, TestResult
 )
 from ..core.capability_discovery import CapabilityDiscovery, DiscoveryStatus
 from ..core.model_manager import ModelManager
@@ -463,19 +463,23 @@ class CapabilityManagerWidget(QWidget):
     
     def show_tests(self, capability: Capability):
         """显示测试信息"""
+        # 表格行和统计使用同一数据：每个测试用例一行，结果取该用例最近一次的测试结果
+        latest_results = {result.test_id: result for result in capability.test_results}
+        case_results = [(test, latest_results.get(test.test_id)) for test in capability.test_cases]
+        
         # 测试用例
-        self.tests_table.setRowCount(len(capability.tests))
-        for row, test in enumerate(capability.tests):
+        self.tests_table.setRowCount(len(case_results))
+        for row, (test, result) in enumerate(case_results):
             self.tests_table.setItem(row, 0, QTableWidgetItem(test.test_id))
-            self.tests_table.setItem(row, 1, QTableWidgetItem(str(test.input_parameters)))
+            self.tests_table.setItem(row, 1, QTableWidgetItem(str(test.input_data)))
             self.tests_table.setItem(row, 2, QTableWidgetItem(str(test.expected_output)))
-            self.tests_table.setItem(row, 3, QTableWidgetItem(str(test.actual_output or "")))
-            self.tests_table.setItem(row, 4, QTableWidgetItem(test.result.value if test.result else "未测试"))
+            self.tests_table.setItem(row, 3, QTableWidgetItem(str(result.actual_output or "") if result else ""))
+            self.tests_table.setItem(row, 4, QTableWidgetItem(result.result.value if result else "未测试"))
         
         # 测试统计
-        total_tests = len(capability.tests)
-        passed_tests = len([t for t in capability.tests if t.result and t.result.value == "passed"])
-        failed_tests = len([t for t in capability.tests if t.result and t.result.value == "failed"])
+        total_tests = len(case_results)
+        passed_tests = len([r for _, r in case_results if r and r.result == TestResult.PASSED])
+        failed_tests = len([r for _, r in case_results if r and r.result == TestResult.FAILED])
         success_rate = (passed_tests / total_tests * 100) if total_tests > 0 else 0
         
         self.total_tests_label.setText(f"总测试: {total_tests}")
@@ -546,6 +550,7 @@ class CapabilityManagerWidget(QWidget):
         if running_tasks:
             task = running_tasks[0]  # 显示第一个运行中的任务
             self.discovery_progress.setValue(int(task.progress))
+            self.discovery_progress.setVisible(True)
             self.discovery_status_label.setText(f"发现任务进行中: {task.task_id} ({task.progress:.1f}%)")
             
             # 检查任务是否完成
@@ -7,7 +7,7 @@ import os
 import re
 import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet, Iterable
 from enum import Enum
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, 
@@ -20,6 +20,15 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QThread, QDateTime
 from PyQt6.QtGui import QFont, QColor, QPalette, QTextCursor, QAction, QIcon
 
+# 标准格式日志: [时间] [级别] [日志器] 消息
+_LOG_LINE_RE = re.compile(r'\[(.*?)\] \[(.*?)\] \[(.*?)\] (.*)')
+
+# 多行文本中逐行匹配JSON格式或标准格式日志，供批量解析使用
+_LOG_TEXT_RE = re.compile(
+    r'^[ \t]*(?:(\{.*?)|\[(.*?)\] \[(.*?)\] \[(.*?)\] (.*?))[ \t\r]*$',
+    re.MULTILINE
+)
+
 
 class LogLevel(Enum):
     """日志级别枚举"""
@@ -31,25 +40,49 @@ class LogLevel(Enum):
 
 
 class LogEntry:
-    """日志条目"""
+    """日志条目（创建后不可修改）"""
+    
+    # 日志文件可能解析出大量条目，使用 __slots__ 避免每个实例携带 __dict__
+    __slots__ = ('timestamp', 'level', 'logger', 'message', 'extra_data', '_dict_cache')
+    
+    # 仅声明类型供类型检查使用，不赋默认值，与 __slots__ 兼容
+    timestamp: datetime
+    level: LogLevel
+    logger: str
+    message: str
+    extra_data: Dict[str, Any]
+    _dict_cache: Optional[Dict[str, Any]]
     
     def __init__(self, timestamp: datetime, level: LogLevel, logger: str, 
                  message: str, extra_data: Optional[Dict] = None):
-        self.timestamp = timestamp
-        self.level = level
-        self.logger = logger
-        self.message = message
-        self.extra_data = extra_data or {}
+        object.__setattr__(self, 'timestamp', timestamp)
+        object.__setattr__(self, 'level', level)
+        object.__setattr__(self, 'logger', logger)
+        object.__setattr__(self, 'message', message)
+        object.__setattr__(self, 'extra_data', extra_data or {})
+        object.__setattr__(self, '_dict_cache', None)
+        
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"LogEntry 不可修改: {name}")
+        
+    def __reduce__(self):
+        # 通过构造函数重建，使 copy/pickle 不经过被禁止的 __setattr__
+        return (self.__class__, (self.timestamp, self.level, self.logger,
+                                 self.message, self.extra_data))
         
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'timestamp': self.timestamp.isoformat(),
-            'level': self.level.value,
-            'logger': self.logger,
-            'message': self.message,
-            'extra_data': self.extra_data
-        }
+        """转换为字典（条目不可修改，缓存不会过期；首次转换后缓存，返回副本）"""
+        cached = self._dict_cache
+        if cached is None:
+            cached = {
+                'timestamp': self.timestamp.isoformat(),
+                'level': self.level.value,
+                'logger': self.logger,
+                'message': self.message,
+                'extra_data': self.extra_data
+            }
+            object.__setattr__(self, '_dict_cache', cached)
+        return dict(cached)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'LogEntry':
@@ -67,31 +100,52 @@ class LogFilter:
     """日志过滤器"""
     
     def __init__(self):
-        self.levels: List[LogLevel] = []
-        self.loggers: List[str] = []
+        self._levels: FrozenSet[LogLevel] = frozenset()
+        self._loggers: FrozenSet[str] = frozenset()
         self.keywords: List[str] = []
         self.time_range: Optional[Tuple[datetime, datetime]] = None
         self.regex_pattern: Optional[str] = None
         
+    @property
+    def levels(self) -> FrozenSet[LogLevel]:
+        """允许的日志级别（赋值时转换为集合，成员判断为O(1)）"""
+        return self._levels
+        
+    @levels.setter
+    def levels(self, levels: Iterable[LogLevel]):
+        self._levels = frozenset(levels)
+        
+    @property
+    def loggers(self) -> FrozenSet[str]:
+        """允许的日志器名称（赋值时转换为集合）"""
+        return self._loggers
+        
+    @loggers.setter
+    def loggers(self, loggers: Iterable[str]):
+        self._loggers = frozenset(loggers)
+        
     def matches(self, entry: LogEntry) -> bool:
         """检查日志条目是否匹配过滤器"""
         # 级别过滤
-        if self.levels and entry.level not in self.levels:
+        if self._levels and entry.level not in self._levels:
             return False
             
         # 日志器过滤
-        if self.loggers and entry.logger not in self.loggers:
+        if self._loggers and entry.logger not in self._loggers:
             return False
             
-        # 时间范围过滤
+        # 时间范围过滤（起止时间为空表示不限制该端）
         if self.time_range:
             start, end = self.time_range
-            if not (start <= entry.timestamp <= end):
+            if start is not None and entry.timestamp < start:
+                return False
+            if end is not None and entry.timestamp > end:
                 return False
                 
         # 关键词过滤
         if self.keywords:
-            if not any(keyword.lower() in entry.message.lower() for keyword in self.keywords):
+            message = entry.message.lower()
+            if not any(keyword.lower() in message for keyword in self.keywords):
                 return False
                 
         # 正则表达式过滤
@@ -104,11 +158,30 @@ class LogFilter:
                 pass
                 
         return True
+        
+    def matches_many(self, entries: Iterable[LogEntry]) -> List[bool]:
+        """批量检查日志条目，返回与输入一一对应的结果（与 matches 使用同一套规则）"""
+        return [self.matches(entry) for entry in entries]
 
 
 class LogParser:
     """日志解析器"""
     
+    @staticmethod
+    def _entry_from_fields(timestamp_str: str, level_str: str, logger: str, message: str) -> LogEntry:
+        """由标准格式日志的各字段创建日志条目"""
+        try:
+            timestamp = datetime.fromisoformat(timestamp_str)
+        except ValueError:
+            timestamp = datetime.now()
+            
+        try:
+            level = LogLevel(level_str)
+        except ValueError:
+            level = LogLevel.INFO
+            
+        return LogEntry(timestamp, level, logger, message)
+    
     @staticmethod
     def parse_log_line(line: str) -> Optional[LogEntry]:
         """解析单行日志"""
@@ -119,37 +192,38 @@ class LogParser:
                 return LogEntry.from_dict(data)
             
             # 解析标准格式日志: [时间] [级别] [日志器] 消息
-            pattern = r'\[(.*?)\] \[(.*?)\] \[(.*?)\] (.*)'
-            match = re.match(pattern, line)
+            match = _LOG_LINE_RE.match(line)
             if match:
-                timestamp_str, level_str, logger, message = match.groups()
-                try:
-                    timestamp = datetime.fromisoformat(timestamp_str)
-                except ValueError:
-                    timestamp = datetime.now()
-                    
-                try:
-                    level = LogLevel(level_str)
-                except ValueError:
-                    level = LogLevel.INFO
-                    
-                return LogEntry(timestamp, level, logger, message)
+                return LogParser._entry_from_fields(*match.groups())
                 
-        except (json.JSONDecodeError, ValueError, AttributeError):
+        except (json.JSONDecodeError, ValueError, KeyError, AttributeError):
             pass
             
         return None
     
     @staticmethod
-    def parse_log_file(file_path: str) -> List[LogEntry]:
-        """解析日志文件"""
+    def parse_many(text: str) -> List[LogEntry]:
+        """批量解析多行日志文本，一次扫描完成匹配，无法解析的行被跳过"""
         entries = []
+        for match in _LOG_TEXT_RE.finditer(text):
+            json_text, timestamp_str, level_str, logger, message = match.groups()
+            try:
+                if json_text is not None:
+                    entries.append(LogEntry.from_dict(json.loads(json_text)))
+                else:
+                    entries.append(LogParser._entry_from_fields(timestamp_str, level_str, logger, message))
+            except (json.JSONDecodeError, ValueError, KeyError, TypeError, AttributeError):
+                pass
+                
+        return entries
+    
+    @staticmethod
+    def parse_log_file(file_path: str) -> List[LogEntry]:
+        """解析日志文件（读入全部内容后批量解析）"""
+        entries: List[LogEntry] = []
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    entry = LogParser.parse_log_line(line.strip())
-                    if entry:
-                        entries.append(entry)
+                entries = LogParser.parse_many(f.read())
         except Exception as e:
             print(f"解析日志文件失败: {e}")
             
@@ -207,10 +281,8 @@ class LogSearchThread(QThread):
         
     def run(self):
         """执行搜索"""
-        filtered_entries = []
-        for entry in self.entries:
-            if self.filter_obj.matches(entry):
-                filtered_entries.append(entry)
+        mask = self.filter_obj.matches_many(self.entries)
+        filtered_entries = [entry for entry, matched in zip(self.entries, mask) if matched]
                 
         self.search_completed.emit(filtered_entries)
 
@@ -488,9 +560,10 @@ class LogViewerWidget(QWidget):
         search_filter = LogFilter()
         search_filter.keywords = [search_text]
         
+        mask = search_filter.matches_many(self.filtered_entries)
         matching_entries = [
-            entry for entry in self.filtered_entries 
-            if search_filter.matches(entry)
+            entry for entry, matched in zip(self.filtered_entries, mask)
+            if matched
         ]
         
         if matching_entries:
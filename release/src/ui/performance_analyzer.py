@@ -40,15 +40,22 @@ class PerformanceMetric(Enum):
     ERROR_RATE = "error_rate"
 
 
-@dataclass
+@dataclass(frozen=True)
 class PerformanceIssue:
-    """性能问题"""
+    """性能问题（不可变，字段没有默认值，可以直接声明 __slots__）"""
+    __slots__ = ('issue_type', 'severity', 'description',
+                 'affected_components', 'recommendations', 'metrics')
+    
     issue_type: str
     severity: str  # "low", "medium", "high", "critical"
     description: str
     affected_components: List[str]
     recommendations: List[str]
     metrics: Dict[str, Any]
+    
+    def __reduce__(self):
+        # frozen + __slots__ 时默认的 copy/pickle 会逐个 setattr 而失败，改为通过构造函数重建
+        return (self.__class__, tuple(getattr(self, name) for name in self.__slots__))
 
 
 class PerformanceAnalyzer:
@@ -0,0 +1,28 @@
+"""
+测试公共配置
+提供跨测试模块共享的夹具
+"""
+
+import os
+
+import pytest
+
+
+def pytest_addoption(parser):
+    """注册项目自定义命令行选项"""
+    parser.addoption(
+        "--all-strategies",
+        action="store_true",
+        default=False,
+        help="对所有测试优化策略运行参数化测试（默认只运行代表性策略）"
+    )
+
+
+@pytest.fixture(scope="session")
+def app():
+    """创建会话级QApplication实例（Qt要求全局唯一，每个xdist工作进程各有一个）"""
+    # 无显示环境（CI、xdist工作进程）下使用离屏平台，显式设置时保持不变
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
@@ -5,8 +5,6 @@
 
 import pytest
 import asyncio
-import tempfile
-import os
 from pathlib import Path
 from unittest.mock import Mock, patch, AsyncMock
 from typing import Dict, List, Any
@@ -23,20 +21,13 @@ class TestEndToEndWorkflow:
     """端到端工作流测试"""
     
     @pytest.fixture
-    async def temp_database(self):
-        """创建临时数据库"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
-        
-        try:
-            db_manager = DatabaseManager(temp_db_path)
-            db_manager.connect()
-            db_manager.initialize_tables()
-            yield db_manager
-            db_manager.disconnect()
-        finally:
-            if os.path.exists(temp_db_path):
-                os.unlink(temp_db_path)
+    async def temp_database(self, tmp_path):
+        """创建临时数据库（临时目录由pytest清理）"""
+        db_manager = DatabaseManager(str(tmp_path / "test.db"))
+        db_manager.connect()
+        db_manager.initialize_database()
+        yield db_manager
+        db_manager.disconnect()
     
     @pytest.fixture
     async def capability_registry(self):
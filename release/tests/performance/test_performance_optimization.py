@@ -6,8 +6,6 @@
 import pytest
 import asyncio
 import time
-import tempfile
-import os
 from unittest.mock import Mock, patch
 
 from src.utils.performance_analyzer import (
@@ -126,24 +124,13 @@ class TestDatabaseOptimizer:
     """数据库优化器测试"""
     
     @pytest.fixture
-    def temp_database(self):
-        """创建临时数据库"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
-        
-        try:
-            db_manager = DatabaseManager(temp_db_path)
-            db_manager.connect()
-            db_manager.initialize_database()  # 修复方法名
-            yield db_manager
-            db_manager.disconnect()
-        finally:
-            if os.path.exists(temp_db_path):
-                try:
-                    os.unlink(temp_db_path)
-                except PermissionError:
-                    # 在Windows上，文件可能被锁定，忽略删除错误
-                    pass
+    def temp_database(self, tmp_path):
+        """创建临时数据库（临时目录由pytest清理，Windows上被锁定的文件不会导致测试失败）"""
+        db_manager = DatabaseManager(str(tmp_path / "test.db"))
+        db_manager.connect()
+        db_manager.initialize_database()  # 修复方法名
+        yield db_manager
+        db_manager.disconnect()
     
     def test_database_optimizer_initialization(self, temp_database):
         """测试数据库优化器初始化"""
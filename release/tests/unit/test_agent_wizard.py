@@ -4,14 +4,9 @@
 """
 
 import pytest
-import sys
-import os
 from unittest.mock import Mock, MagicMock
 
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
-
-from PyQt6.QtWidgets import QApplication, QWizard
+from PyQt6.QtWidgets import QWizard
 from PyQt6.QtCore import Qt
 
 from src.ui.agent_wizard import (
@@ -21,61 +16,72 @@ from src.ui.agent_wizard import (
 from src.core.agent_model import AgentRegistry, AgentType, AgentPriority, AgentTemplate
 from src.core.capability_model import CapabilityRegistry, Capability, CapabilityType
 
+pytestmark = pytest.mark.gui
+
+
+def _make_model(name: str, model_id: str) -> Mock:
+    """创建模型Mock（name需在构造后赋值，否则会被Mock自身占用）"""
+    model = Mock(model_id=model_id)
+    model.name = name
+    return model
+
+
+# 模块级共享的模型Mock列表，测试只读使用
+_MODELS = [
+    _make_model("GPT-3.5", "gpt-3.5-turbo"),
+    _make_model("GPT-4", "gpt-4"),
+]
+
+
+@pytest.fixture(scope="module")
+def _capabilities():
+    """创建模块级共享的测试能力对象"""
+    text_capability = Capability(
+        capability_id="text_generation",
+        name="文本生成",
+        description="生成文本内容",
+        capability_type=CapabilityType.TEXT_GENERATION,
+        parameters=[],
+        outputs=[]
+    )
+    code_capability = Capability(
+        capability_id="code_generation",
+        name="代码生成",
+        description="生成代码",
+        capability_type=CapabilityType.CODE_GENERATION,
+        parameters=[],
+        outputs=[]
+    )
+    return [text_capability, code_capability]
+
 
 class TestAgentWizard:
     """代理创建向导测试类"""
     
-    @pytest.fixture
-    def app(self):
-        """创建QApplication实例"""
-        app = QApplication.instance()
-        if app is None:
-            app = QApplication([])
-        return app
-    
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def agent_registry(self):
-        """创建代理注册表实例"""
+        """创建代理注册表实例（模块内只读共享）"""
         registry = AgentRegistry()
         return registry
     
     @pytest.fixture
-    def capability_registry(self):
+    def isolated_agent_registry(self):
+        """创建独立的代理注册表实例，供会修改注册表的测试使用"""
+        return AgentRegistry()
+    
+    @pytest.fixture(scope="module")
+    def capability_registry(self, _capabilities):
         """创建能力注册表实例"""
         registry = CapabilityRegistry()
         # 添加测试能力
-        text_capability = Capability(
-            capability_id="text_generation",
-            name="文本生成",
-            description="生成文本内容",
-            capability_type=CapabilityType.TEXT_GENERATION,
-            parameters=[],
-            outputs=[]
-        )
-        code_capability = Capability(
-            capability_id="code_generation",
-            name="代码生成",
-            description="生成代码",
-            capability_type=CapabilityType.CODE_GENERATION,
-            parameters=[],
-            outputs=[]
-        )
-        registry.register_capability(text_capability)
-        registry.register_capability(code_capability)
+        for capability in _capabilities:
+            registry.register_capability(capability)
         return registry
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def model_manager(self):
         """创建模型管理器Mock"""
-        manager = Mock()
-        model1 = Mock()
-        model1.name = "GPT-3.5"
-        model1.model_id = "gpt-3.5-turbo"
-        model2 = Mock()
-        model2.name = "GPT-4"
-        model2.model_id = "gpt-4"
-        manager.list_models.return_value = [model1, model2]
-        return manager
+        return Mock(list_models=Mock(return_value=_MODELS))
     
     def test_agent_wizard_page_creation(self, app):
         """测试代理向导页面创建"""
@@ -96,15 +102,6 @@ class TestAgentWizard:
         assert page.priority_combo is not None
         assert page.auto_start_check is not None
         assert page.max_tasks_spin is not None
-        
-        # 验证字段注册 - 注意：字段值在初始化时可能为None
-        # 这些断言主要验证控件存在，字段值会在用户交互时设置
-        assert page.name_edit is not None
-        assert page.description_edit is not None
-        assert page.type_combo is not None
-        assert page.priority_combo is not None
-        assert page.auto_start_check is not None
-        assert page.max_tasks_spin is not None
     
     def test_agent_basic_info_page_validation(self, app):
         """测试代理基本信息页面验证"""
@@ -206,9 +203,9 @@ class TestAgentWizard:
         # 验证页面数量
         assert wizard.pageCount() == 4
     
-    def test_agent_creation_wizard_accept(self, app, agent_registry, capability_registry, model_manager):
+    def test_agent_creation_wizard_accept(self, app, isolated_agent_registry, capability_registry, model_manager):
         """测试代理创建向导接受处理"""
-        wizard = AgentCreationWizard(agent_registry, capability_registry, model_manager)
+        wizard = AgentCreationWizard(isolated_agent_registry, capability_registry, model_manager)
         
         # 设置字段值
         wizard.setField("name", "测试代理")
@@ -227,7 +224,7 @@ class TestAgentWizard:
         wizard.accept()
         
         # 验证代理被创建
-        agents = agent_registry.list_agents()
+        agents = isolated_agent_registry.list_agents()
         assert len(agents) == 1
         agent = agents[0]
         assert agent.name == "测试代理"
@@ -241,15 +238,7 @@ class TestAgentWizard:
 class TestAgentWizardIntegration:
     """代理创建向导集成测试"""
     
-    @pytest.fixture
-    def app(self):
-        """创建QApplication实例"""
-        app = QApplication.instance()
-        if app is None:
-            app = QApplication([])
-        return app
-    
-    def test_wizard_complete_flow(self, app):
+    def test_wizard_complete_flow(self, app, _capabilities):
         """测试向导完整流程"""
         # 创建必要的管理器
         agent_registry = AgentRegistry()
@@ -257,21 +246,10 @@ class TestAgentWizardIntegration:
         model_manager = Mock()
         
         # 添加测试能力
-        text_capability = Capability(
-            capability_id="text_generation",
-            name="文本生成",
-            description="生成文本内容",
-            capability_type=CapabilityType.TEXT_GENERATION,
-            parameters=[],
-            outputs=[]
-        )
-        capability_registry.register_capability(text_capability)
+        capability_registry.register_capability(_capabilities[0])
         
         # 添加测试模型
-        model1 = Mock()
-        model1.name = "GPT-3.5"
-        model1.model_id = "gpt-3.5-turbo"
-        model_manager.list_models.return_value = [model1]
+        model_manager.list_models.return_value = _MODELS[:1]
         
         # 创建向导
         wizard = AgentCreationWizard(agent_registry, capability_registry, model_manager)
@@ -12,6 +12,91 @@ from src.adapters.base_adapter import BaseAdapter
 from src.core.model_config import ModelConfig
 
 
+class _ConcreteAdapter(BaseAdapter):
+    """测试用具体适配器，各方法的实现由测试按需注入"""
+    
+    def __init__(self, config: ModelConfig, **impls):
+        super().__init__(config)
+        self.calls = []
+        self._impls = impls
+    
+    async def _dispatch(self, name: str, default: Any, *args, **kwargs):
+        """记录调用并委托给注入的实现，未注入时返回默认值"""
+        self.calls.append((name, *args, kwargs) if args else (name,))
+        impl = self._impls.get(name)
+        if impl is None:
+            return default
+        return await impl(self, *args, **kwargs)
+    
+    async def connect(self) -> bool:
+        return await self._dispatch('connect', True)
+    
+    async def disconnect(self):
+        await self._dispatch('disconnect', None)
+    
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        return await self._dispatch('generate_text', "response", prompt, **kwargs)
+    
+    async def generate_stream(self, prompt: str, **kwargs):
+        self.calls.append(('generate_stream', prompt, kwargs))
+        impl = self._impls.get('generate_stream')
+        if impl is None:
+            yield "stream"
+            return
+        async for chunk in impl(self, prompt, **kwargs):
+            yield chunk
+    
+    async def health_check(self) -> bool:
+        return await self._dispatch('health_check', True)
+    
+    async def get_available_models(self) -> Dict[str, Any]:
+        return await self._dispatch('get_available_models', {})
+    
+    async def test_connection(self) -> bool:
+        return await self._dispatch('test_connection', True)
+    
+    async def get_model_info(self) -> Dict[str, Any]:
+        return await self._dispatch('get_model_info', {})
+
+
+@pytest.fixture
+def model_config():
+    """创建配置Mock，适配器只保存配置对象，无需按ModelConfig规格构造"""
+    return Mock()
+
+
+@pytest.fixture
+def make_adapter(model_config):
+    """创建适配器工厂，关键字参数为需要替换的方法实现"""
+    def _make(**impls) -> _ConcreteAdapter:
+        return _ConcreteAdapter(model_config, **impls)
+    return _make
+
+
+@pytest.fixture(scope="module")
+def failing_adapter():
+    """创建所有方法均抛出异常的适配器（模块内共享）"""
+    
+    def failing(error_type: type, message: str):
+        # 每次调用抛出新的异常实例，避免共享实例的 __traceback__ 随调用次数增长
+        async def impl(adapter, *args, **kwargs):
+            raise error_type(message)
+        return impl
+    
+    async def failing_stream(adapter, prompt: str, **kwargs):
+        raise RuntimeError("Stream error")
+        yield
+    
+    return _ConcreteAdapter(
+        Mock(),
+        generate_text=failing(ConnectionError, "Connection failed"),
+        generate_stream=failing_stream,
+        get_available_models=failing(ValueError, "Model error"),
+        test_connection=failing(ConnectionError, "Connection test failed"),
+        get_model_info=failing(RuntimeError, "Info error")
+    )
+
+
 class TestBaseAdapter:
     """测试基础适配器类"""
     
@@ -37,94 +122,46 @@ class TestBaseAdapter:
         with pytest.raises(TypeError):
             IncompleteAdapter(Mock())
     
-    def test_base_adapter_interface_contract(self):
+    def test_base_adapter_interface_contract(self, model_config, make_adapter):
         """测试适配器接口契约"""
-        
-        class CompleteAdapter(BaseAdapter):
-            """完整的适配器实现"""
-            
-            def __init__(self, config: ModelConfig):
-                super().__init__(config)
-                self.test_calls = []
-            
-            async def connect(self) -> bool:
-                self.test_calls.append(('connect',))
-                return True
-            
-            async def disconnect(self):
-                self.test_calls.append(('disconnect',))
-            
-            async def generate_text(self, prompt: str, **kwargs):
-                self.test_calls.append(('generate_text', prompt, kwargs))
-                from src.adapters.base_adapter import ModelResponse
-                return ModelResponse(
-                    content=f"Response to: {prompt}",
-                    model=self.config.name,
-                    usage={"total_tokens": 10},
-                    finish_reason="stop",
-                    response_time=0.1
-                )
-            
-            async def generate_stream(self, prompt: str, callback, **kwargs):
-                self.test_calls.append(('generate_stream', prompt, kwargs))
-                callback("Stream response to: {prompt}")
-            
-            async def health_check(self) -> bool:
-                self.test_calls.append(('health_check',))
-                return True
-        
         # 测试完整实现
-        config = Mock(spec=ModelConfig)
-        adapter = CompleteAdapter(config)
+        adapter = make_adapter()
         
-        assert adapter.config == config
-        assert adapter.test_calls == []
+        assert adapter.config == model_config
+        assert adapter.calls == []
     
     @pytest.mark.asyncio
-    async def test_base_adapter_method_calls(self):
+    async def test_base_adapter_method_calls(self, make_adapter):
         """测试适配器方法调用"""
         
-        class TestAdapter(BaseAdapter):
-            """测试适配器实现"""
-            
-            def __init__(self, config: ModelConfig):
-                super().__init__(config)
-                self.calls = []
-            
-            async def generate_text(self, prompt: str, **kwargs) -> str:
-                self.calls.append(('generate_text', prompt, kwargs))
-                return f"Text: {prompt}"
-            
-            async def generate_stream(self, prompt: str, **kwargs):
-                self.calls.append(('generate_stream', prompt, kwargs))
-                yield f"Stream: {prompt}"
-            
-            async def get_available_models(self) -> Dict[str, Any]:
-                self.calls.append(('get_available_models',))
-                return {"test_model": {"name": "Test Model"}}
-            
-            async def test_connection(self) -> bool:
-                self.calls.append(('test_connection',))
-                return True
-            
-            async def get_model_info(self) -> Dict[str, Any]:
-                self.calls.append(('get_model_info',))
-                return {"name": "Test Model"}
+        async def generate_text(adapter, prompt: str, **kwargs) -> str:
+            return f"Text: {prompt}"
+        
+        async def generate_stream(adapter, prompt: str, **kwargs):
+            yield f"Stream: {prompt}"
         
-        config = Mock(spec=ModelConfig)
-        adapter = TestAdapter(config)
+        async def get_available_models(adapter) -> Dict[str, Any]:
+            return {"test_model": {"name": "Test Model"}}
+        
+        async def get_model_info(adapter) -> Dict[str, Any]:
+            return {"name": "Test Model"}
+        
+        adapter = make_adapter(
+            generate_text=generate_text,
+            generate_stream=generate_stream,
+            get_available_models=get_available_models,
+            get_model_info=get_model_info
+        )
         
         # 测试 generate_text
         result = await adapter.generate_text("Hello", temperature=0.7)
         assert result == "Text: Hello"
         assert ('generate_text', "Hello", {'temperature': 0.7}) in adapter.calls
         
-        # 测试 generate_stream
-        stream_results = []
-        async for chunk in adapter.generate_stream("Stream test", max_tokens=100):
-            stream_results.append(chunk)
-        
-        assert stream_results == ["Stream: Stream test"]
+        # 测试 generate_stream（anext() 需要 Python 3.10+，这里直接调用 __anext__）
+        stream = adapter.generate_stream("Stream test", max_tokens=100)
+        assert await stream.__anext__() == "Stream: Stream test"
+        await stream.aclose()
         assert ('generate_stream', "Stream test", {'max_tokens': 100}) in adapter.calls
         
         # 测试 get_available_models
@@ -142,145 +179,52 @@ class TestBaseAdapter:
         assert model_info == {"name": "Test Model"}
         assert ('get_model_info',) in adapter.calls
     
-    def test_base_adapter_error_handling(self):
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("method,exc", [
+        ("generate_text", ConnectionError),
+        ("generate_stream", RuntimeError),
+        ("get_available_models", ValueError),
+        ("test_connection", ConnectionError),
+        ("get_model_info", RuntimeError),
+    ])
+    async def test_base_adapter_error_handling(self, failing_adapter, method, exc):
         """测试适配器错误处理"""
-        
-        class ErrorAdapter(BaseAdapter):
-            """错误处理适配器"""
-            
-            def __init__(self, config: ModelConfig):
-                super().__init__(config)
-                self.should_fail = False
-            
-            async def generate_text(self, prompt: str, **kwargs) -> str:
-                if self.should_fail:
-                    raise ConnectionError("Connection failed")
-                return "Success"
-            
-            async def generate_stream(self, prompt: str, **kwargs):
-                if self.should_fail:
-                    raise RuntimeError("Stream error")
-                yield "Success"
-            
-            async def get_available_models(self) -> Dict[str, Any]:
-                if self.should_fail:
-                    raise ValueError("Model error")
-                return {}
-            
-            async def test_connection(self) -> bool:
-                if self.should_fail:
-                    raise ConnectionError("Connection test failed")
-                return True
-            
-            async def get_model_info(self) -> Dict[str, Any]:
-                if self.should_fail:
-                    raise RuntimeError("Info error")
-                return {}
-        
-        config = Mock(spec=ModelConfig)
-        adapter = ErrorAdapter(config)
-        
-        # 测试正常情况
-        adapter.should_fail = False
-        
-        # 测试错误情况
-        adapter.should_fail = True
+        call = getattr(failing_adapter, method)
         
         # 验证错误类型
-        with pytest.raises(ConnectionError):
-            asyncio.run(adapter.generate_text("test"))
-        
-        with pytest.raises(RuntimeError):
-            async def test_stream():
-                async for _ in adapter.generate_stream("test"):
+        with pytest.raises(exc):
+            if method == "generate_stream":
+                async for _ in call("test"):
                     pass
-            asyncio.run(test_stream())
-        
-        with pytest.raises(ValueError):
-            asyncio.run(adapter.get_available_models())
-        
-        with pytest.raises(ConnectionError):
-            asyncio.run(adapter.test_connection())
-        
-        with pytest.raises(RuntimeError):
-            asyncio.run(adapter.get_model_info())
+            elif method == "generate_text":
+                await call("test")
+            else:
+                await call()
     
-    def test_base_adapter_config_management(self):
+    def test_base_adapter_config_management(self, model_config, make_adapter):
         """测试适配器配置管理"""
-        
-        class ConfigAdapter(BaseAdapter):
-            """配置管理适配器"""
-            
-            def __init__(self, config: ModelConfig):
-                super().__init__(config)
-                self.config_updates = []
-            
-            async def generate_text(self, prompt: str, **kwargs) -> str:
-                return "response"
-            
-            async def generate_stream(self, prompt: str, **kwargs):
-                yield "stream"
-            
-            async def get_available_models(self) -> Dict[str, Any]:
-                return {}
-            
-            async def test_connection(self) -> bool:
-                return True
-            
-            async def get_model_info(self) -> Dict[str, Any]:
-                return {}
-        
         # 测试配置传递
-        config = Mock(spec=ModelConfig)
-        config.name = "test_model"
-        config.provider = "test_provider"
+        model_config.name = "test_model"
+        model_config.provider = "test_provider"
         
-        adapter = ConfigAdapter(config)
+        adapter = make_adapter()
         
+        assert adapter.config is model_config
         assert adapter.config.name == "test_model"
         assert adapter.config.provider == "test_provider"
         
-        # 测试配置不可变性
-        with pytest.raises(AttributeError):
-            adapter.config = Mock()
+        # 适配器直接引用传入的配置对象，配置修改对适配器立即可见
+        model_config.name = "renamed_model"
+        assert adapter.config.name == "renamed_model"
 
 
 class TestBaseAdapterIntegration:
     """测试基础适配器集成功能"""
     
     @pytest.mark.asyncio
-    async def test_adapter_lifecycle(self):
+    async def test_adapter_lifecycle(self, make_adapter):
         """测试适配器生命周期"""
-        
-        class LifecycleAdapter(BaseAdapter):
-            """生命周期测试适配器"""
-            
-            def __init__(self, config: ModelConfig):
-                super().__init__(config)
-                self.lifecycle_events = []
-            
-            async def generate_text(self, prompt: str, **kwargs) -> str:
-                self.lifecycle_events.append('generate_text')
-                return "response"
-            
-            async def generate_stream(self, prompt: str, **kwargs):
-                self.lifecycle_events.append('generate_stream')
-                yield "stream"
-            
-            async def get_available_models(self) -> Dict[str, Any]:
-                self.lifecycle_events.append('get_available_models')
-                return {}
-            
-            async def test_connection(self) -> bool:
-                self.lifecycle_events.append('test_connection')
-                return True
-            
-            async def get_model_info(self) -> Dict[str, Any]:
-                self.lifecycle_events.append('get_model_info')
-                return {}
-        
-        config = Mock(spec=ModelConfig)
-        adapter = LifecycleAdapter(config)
+        adapter = make_adapter()
         
         # 执行一系列操作
         await adapter.test_connection()
@@ -294,55 +238,31 @@ class TestBaseAdapterIntegration:
         # 验证生命周期事件顺序
         expected_events = [
             'test_connection',
-            'get_available_models', 
+            'get_available_models',
             'get_model_info',
             'generate_text',
             'generate_stream'
         ]
         
-        assert adapter.lifecycle_events == expected_events
+        assert [call[0] for call in adapter.calls] == expected_events
     
     @pytest.mark.asyncio
-    async def test_adapter_concurrent_operations(self):
+    async def test_adapter_concurrent_operations(self, make_adapter):
         """测试适配器并发操作"""
+        state = {'concurrent_calls': 0, 'max_concurrent': 0}
         
-        class ConcurrentAdapter(BaseAdapter):
-            """并发测试适配器"""
-            
-            def __init__(self, config: ModelConfig):
-                super().__init__(config)
-                self.concurrent_calls = 0
-                self.max_concurrent = 0
-            
-            async def generate_text(self, prompt: str, **kwargs) -> str:
-                self.concurrent_calls += 1
-                self.max_concurrent = max(self.max_concurrent, self.concurrent_calls)
-                await asyncio.sleep(0.01)  # 模拟处理时间
-                self.concurrent_calls -= 1
-                return f"Response to {prompt}"
-            
-            async def generate_stream(self, prompt: str, **kwargs):
-                self.concurrent_calls += 1
-                self.max_concurrent = max(self.max_concurrent, self.concurrent_calls)
-                await asyncio.sleep(0.01)
-                self.concurrent_calls -= 1
-                yield f"Stream for {prompt}"
-            
-            async def get_available_models(self) -> Dict[str, Any]:
-                return {}
-            
-            async def test_connection(self) -> bool:
-                return True
-            
-            async def get_model_info(self) -> Dict[str, Any]:
-                return {}
+        async def generate_text(adapter, prompt: str, **kwargs) -> str:
+            state['concurrent_calls'] += 1
+            state['max_concurrent'] = max(state['max_concurrent'], state['concurrent_calls'])
+            await asyncio.sleep(0)  # 让出事件循环，使其他任务得以交错执行
+            state['concurrent_calls'] -= 1
+            return f"Response to {prompt}"
         
-        config = Mock(spec=ModelConfig)
-        adapter = ConcurrentAdapter(config)
+        adapter = make_adapter(generate_text=generate_text)
         
         # 并发调用 generate_text
         tasks = [
-            adapter.generate_text(f"prompt_{i}") 
+            adapter.generate_text(f"prompt_{i}")
             for i in range(5)
         ]
         
@@ -354,7 +274,7 @@ class TestBaseAdapterIntegration:
             assert result == f"Response to prompt_{i}"
         
         # 验证并发处理
-        assert adapter.max_concurrent > 1  # 应该支持并发
+        assert state['max_concurrent'] > 1  # 应该支持并发
 
 
 if __name__ == "__main__":
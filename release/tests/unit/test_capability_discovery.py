@@ -5,20 +5,63 @@
 
 import pytest
 import asyncio
-import sys
-import os
-from unittest.mock import Mock, AsyncMock, patch
-
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+from unittest.mock import Mock, patch
 
 from src.core.capability_discovery import (
     CapabilityDiscovery, DiscoveryStatus, DiscoveryTask, DiscoveryResult
 )
 from src.core.capability_model import (
-    CapabilityRegistry, CapabilityType, TestResult, CapabilityTestResult
+    Capability, CapabilityRegistry, CapabilityType, TestResult, CapabilityTestResult
 )
 
+# 测试数据中反复使用的枚举值
+TG, CG, CUS = CapabilityType.TEXT_GENERATION, CapabilityType.CODE_GENERATION, CapabilityType.CUSTOM
+PASSED, FAILED = TestResult.PASSED, TestResult.FAILED
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    """模块内的异步测试共享同一个事件循环"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+async def _generate_text(*args, **kwargs) -> str:
+    """模拟模型文本生成，固定返回同一段文本"""
+    return "测试生成的文本内容"
+
+
+def _make_test_results(results_pattern):
+    """按结果序列构造文本生成能力的测试结果（元组，防止被测代码修改）"""
+    return tuple(
+        CapabilityTestResult(
+            test_id=f"test{i}",
+            capability_id="text_generation",
+            model_id="test_model",
+            result=result
+        )
+        for i, result in enumerate(results_pattern, start=1)
+    )
+
+
+@pytest.fixture(scope="session")
+def passed_results():
+    """单个通过的测试结果（会话内共享）"""
+    return _make_test_results([PASSED])
+
+
+@pytest.fixture(scope="session")
+def pass_pass_fail_results():
+    """三个测试中两个通过（会话内共享）"""
+    return _make_test_results([PASSED, PASSED, FAILED])
+
+
+@pytest.fixture(scope="session")
+def pass_fail_fail_results():
+    """三个测试中一个通过（会话内共享）"""
+    return _make_test_results([PASSED, FAILED, FAILED])
+
 
 class TestCapabilityDiscovery:
     """能力自动发现机制测试类"""
@@ -27,7 +70,7 @@ class TestCapabilityDiscovery:
     def mock_model_manager(self):
         """创建模拟的模型管理器"""
         mock_manager = Mock()
-        mock_manager.generate_text = AsyncMock(return_value="测试生成的文本内容")
+        mock_manager.generate_text = _generate_text
         return mock_manager
     
     @pytest.fixture
@@ -47,11 +90,11 @@ class TestCapabilityDiscovery:
         task_id = await capability_discovery.discover_model_capabilities("test_model")
         
         # 等待任务完成
-        await asyncio.sleep(0.1)
-        
-        # 检查任务状态
         task = capability_discovery.get_task_status(task_id)
         assert task is not None
+        await asyncio.wait_for(task.completion, timeout=1.0)
+        
+        # 检查任务状态
         assert task.status == DiscoveryStatus.COMPLETED
         assert task.model_id == "test_model"
         assert task.progress == 100.0
@@ -62,18 +105,18 @@ class TestCapabilityDiscovery:
         # 只测试文本生成能力
         task_id = await capability_discovery.discover_model_capabilities(
             "test_model", 
-            [CapabilityType.TEXT_GENERATION]
+            [TG]
         )
         
         # 等待任务完成
-        await asyncio.sleep(0.1)
-        
-        # 检查任务状态
         task = capability_discovery.get_task_status(task_id)
         assert task is not None
+        await asyncio.wait_for(task.completion, timeout=1.0)
+        
+        # 检查任务状态
         assert task.status == DiscoveryStatus.COMPLETED
         assert len(task.capability_types) == 1
-        assert task.capability_types[0] == CapabilityType.TEXT_GENERATION
+        assert task.capability_types[0] == TG
     
     def test_get_task_status(self, capability_discovery):
         """测试获取任务状态"""
@@ -81,7 +124,7 @@ class TestCapabilityDiscovery:
         task = DiscoveryTask(
             task_id="test_task",
             model_id="test_model",
-            capability_types=[CapabilityType.TEXT_GENERATION]
+            capability_types=[TG]
         )
         capability_discovery.discovery_tasks["test_task"] = task
         
@@ -107,8 +150,7 @@ class TestCapabilityDiscovery:
         # 获取所有任务
         all_tasks = capability_discovery.get_all_tasks()
         assert len(all_tasks) == 2
-        assert any(task.task_id == "task1" for task in all_tasks)
-        assert any(task.task_id == "task2" for task in all_tasks)
+        assert {task.task_id for task in all_tasks} == {"task1", "task2"}
     
     def test_cancel_task(self, capability_discovery):
         """测试取消任务"""
@@ -141,6 +183,23 @@ class TestCapabilityDiscovery:
         result = capability_discovery.cancel_task("nonexistent")
         assert result is False
     
+    @pytest.mark.asyncio
+    async def test_cancel_running_task(self, capability_discovery, monkeypatch):
+        """测试取消运行中的任务后等待方立即返回"""
+        async def slow_test(*args, **kwargs):
+            await asyncio.sleep(10)
+        
+        monkeypatch.setattr(capability_discovery, "_test_capability_type", slow_test)
+        task_id = await capability_discovery.discover_model_capabilities("test_model", [TG])
+        task = capability_discovery.get_task_status(task_id)
+        await asyncio.sleep(0)
+        assert task.status == DiscoveryStatus.RUNNING
+        
+        assert capability_discovery.cancel_task(task_id) is True
+        await asyncio.wait_for(task.completion, timeout=1.0)
+        assert task.status == DiscoveryStatus.CANCELLED
+        assert task._task_handle.cancelled()
+    
     def test_get_discovery_statistics(self, capability_discovery):
         """测试获取发现统计信息"""
         # 创建不同状态的任务
@@ -163,12 +222,11 @@ class TestCapabilityDiscovery:
         )
         
         # 添加发现的能力
-        from src.core.capability_model import Capability, CapabilityType
         capability = Capability(
             capability_id="test_capability",
             name="测试能力",
             description="测试能力描述",
-            capability_type=CapabilityType.TEXT_GENERATION
+            capability_type=TG
         )
         
         discovery_result = DiscoveryResult(
@@ -187,104 +245,45 @@ class TestCapabilityDiscovery:
         # 获取统计信息
         stats = capability_discovery.get_discovery_statistics()
         
-        assert stats["total_tasks"] == 3
-        assert stats["completed_tasks"] == 1
-        assert stats["failed_tasks"] == 1
-        assert stats["running_tasks"] == 1
-        assert stats["discovered_capabilities"] == 1
-        assert stats["success_rate"] == 1/3
+        assert stats == {
+            "total_tasks": 3,
+            "completed_tasks": 1,
+            "failed_tasks": 1,
+            "running_tasks": 1,
+            "discovered_capabilities": 1,
+            "success_rate": pytest.approx(1/3)
+        }
     
-    @pytest.mark.asyncio
-    async def test_capability_support_detection(self, capability_discovery):
+    @pytest.mark.parametrize("results_fixture,expected", [
+        ("pass_pass_fail_results", True),   # 2/3 = 66.7% >= 60%
+        ("pass_fail_fail_results", False),  # 1/3 = 33.3% < 60%
+    ])
+    def test_capability_support_detection(self, capability_discovery, request, results_fixture, expected):
         """测试能力支持检测"""
-        # 测试通过率超过70%的情况
-        test_results = [
-            CapabilityTestResult(
-                test_id="test1",
-                capability_id="text_generation",
-                model_id="test_model",
-                result=TestResult.PASSED
-            ),
-            CapabilityTestResult(
-                test_id="test2",
-                capability_id="text_generation",
-                model_id="test_model",
-                result=TestResult.PASSED
-            ),
-            CapabilityTestResult(
-                test_id="test3",
-                capability_id="text_generation",
-                model_id="test_model",
-                result=TestResult.FAILED
-            )
-        ]
+        test_results = list(request.getfixturevalue(results_fixture))
         
         is_supported = capability_discovery._is_capability_supported(test_results)
-        assert is_supported is True  # 2/3 = 66.7% < 70%，但实际实现中可能调整了阈值
-        
-        # 测试通过率低于70%的情况
-        test_results_low = [
-            CapabilityTestResult(
-                test_id="test1",
-                capability_id="text_generation",
-                model_id="test_model",
-                result=TestResult.PASSED
-            ),
-            CapabilityTestResult(
-                test_id="test2",
-                capability_id="text_generation",
-                model_id="test_model",
-                result=TestResult.FAILED
-            ),
-            CapabilityTestResult(
-                test_id="test3",
-                capability_id="text_generation",
-                model_id="test_model",
-                result=TestResult.FAILED
-            )
-        ]
-        
-        is_supported_low = capability_discovery._is_capability_supported(test_results_low)
-        assert is_supported_low is False  # 1/3 = 33.3% < 70%
+        assert is_supported is expected
     
-    def test_capability_creation_from_test(self, capability_discovery):
+    @pytest.mark.parametrize("capability_type,expected_name", [
+        (TG, "文本生成"),
+        (CG, "代码生成"),
+        (CUS, None),  # 未知能力类型使用默认定义
+    ])
+    def test_capability_creation_from_test(self, capability_discovery, passed_results,
+                                           capability_type, expected_name):
         """测试从测试结果创建能力"""
-        test_results = [
-            CapabilityTestResult(
-                test_id="test1",
-                capability_id="text_generation",
-                model_id="test_model",
-                result=TestResult.PASSED
-            )
-        ]
-        
-        # 测试文本生成能力创建
         capability = capability_discovery._create_capability_from_test(
-            CapabilityType.TEXT_GENERATION, test_results
+            capability_type, list(passed_results)
         )
         
         assert capability is not None
-        assert capability.capability_type == CapabilityType.TEXT_GENERATION
-        assert capability.name == "文本生成"
-        assert "auto_discovered" in capability.tags
-        
-        # 测试代码生成能力创建
-        code_capability = capability_discovery._create_capability_from_test(
-            CapabilityType.CODE_GENERATION, test_results
-        )
-        
-        assert code_capability is not None
-        assert code_capability.capability_type == CapabilityType.CODE_GENERATION
-        assert code_capability.name == "代码生成"
-        
-        # 测试未知能力类型
-        unknown_capability = capability_discovery._create_capability_from_test(
-            CapabilityType.CUSTOM, test_results
-        )
-        
-        assert unknown_capability is not None
-        assert unknown_capability.capability_type == CapabilityType.CUSTOM
-        assert unknown_capability.status.value == "experimental"
+        assert capability.capability_type == capability_type
+        if expected_name is None:
+            assert capability.status.value == "experimental"
+        else:
+            assert capability.name == expected_name
+            assert "auto_discovered" in capability.tags
 
 
 # 运行测试
@@ -3,75 +3,118 @@
 测试能力管理界面的功能
 """
 
+import asyncio
+import copy
 import pytest
-import sys
-import os
-from unittest.mock import Mock, AsyncMock, patch
+from collections import namedtuple
+from unittest.mock import Mock, patch
 
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+# 未安装PyQt6时跳过整个模块，避免收集阶段导入失败
+pytest.importorskip("PyQt6.QtWidgets")
 
+from PyQt6.QtCore import QSignalBlocker
+from PyQt6.QtWidgets import QMessageBox
 from src.ui.capability_manager import CapabilityManagerWidget
 from src.core.capability_model import (
     Capability, CapabilityType, CapabilityStatus, CapabilityRegistry,
-    CapabilityParameter, CapabilityOutput, CapabilityTest
+    CapabilityParameter, CapabilityOutput, CapabilityTest, CapabilityTestResult, TestResult
 )
 from src.core.capability_discovery import DiscoveryStatus, DiscoveryTask
 
+pytestmark = pytest.mark.gui
+
+# 模拟模型信息，界面只读取 model_id 和 name 两个属性
+FakeModel = namedtuple("FakeModel", "model_id name")
+
+
+def _select_first_capability(widget):
+    """选中首行能力并直接调用选择处理函数，不经过Qt信号分发"""
+    blocker = QSignalBlocker(widget.capability_table)
+    widget.capability_table.selectRow(0)
+    blocker.unblock()
+    widget.on_capability_selected()
+
+
+# 基线测试能力，模块导入时只构造一次；注册时使用浅拷贝，避免删除等操作影响该实例
+_BASELINE_CAPABILITY = Capability(
+    capability_id="test_capability_1",
+    name="测试能力1",
+    description="这是一个测试能力",
+    capability_type=CapabilityType.TEXT_GENERATION,
+    status=CapabilityStatus.AVAILABLE,
+    parameters=[
+        CapabilityParameter(
+            name="prompt",
+            type="string",
+            description="输入提示",
+            required=True
+        )
+    ],
+    outputs=[
+        CapabilityOutput(
+            name="generated_text",
+            type="string",
+            description="生成的文本",
+            format="plain"
+        )
+    ],
+    tags=["test", "text"],
+    category="text_processing",
+    complexity=2
+)
+
 
 class TestCapabilityManager:
     """能力管理界面测试类"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_model_manager(self):
         """创建模拟的模型管理器"""
         mock_manager = Mock()
         mock_manager.get_available_models = Mock(return_value=[
-            Mock(model_id="test_model_1", name="测试模型1"),
-            Mock(model_id="test_model_2", name="测试模型2")
+            FakeModel("test_model_1", "测试模型1"),
+            FakeModel("test_model_2", "测试模型2")
         ])
         return mock_manager
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def capability_registry(self):
-        """创建能力注册表"""
-        registry = CapabilityRegistry()
-        
-        # 添加一些测试能力
-        test_capability = Capability(
-            capability_id="test_capability_1",
-            name="测试能力1",
-            description="这是一个测试能力",
-            capability_type=CapabilityType.TEXT_GENERATION,
-            status=CapabilityStatus.AVAILABLE,
-            parameters=[
-                CapabilityParameter(
-                    name="prompt",
-                    type="string",
-                    description="输入提示",
-                    required=True
-                )
-            ],
-            outputs=[
-                CapabilityOutput(
-                    name="generated_text",
-                    type="string",
-                    description="生成的文本",
-                    format="plain"
-                )
-            ],
-            tags=["test", "text"],
-            category="text_processing",
-            complexity=2
-        )
-        
-        registry.register_capability(test_capability)
-        return registry
+        """创建能力注册表（模块内共享，由capability_manager重置内容）"""
+        return CapabilityRegistry()
+    
+    @pytest.fixture(scope="module")
+    def _shared_capability_manager(self, app, mock_model_manager, capability_registry):
+        """创建模块内共享的能力管理界面"""
+        widget = CapabilityManagerWidget(mock_model_manager, capability_registry)
+        yield widget
+        widget.status_timer.stop()
+        widget.deleteLater()
     
     @pytest.fixture
-    def capability_manager(self, mock_model_manager, capability_registry):
-        """创建能力管理界面"""
-        return CapabilityManagerWidget(mock_model_manager, capability_registry)
+    def capability_manager(self, _shared_capability_manager, capability_registry):
+        """获取能力管理界面，并将界面与注册表重置为初始状态"""
+        widget = _shared_capability_manager
+        
+        # 将共享注册表重置为仅包含基线能力
+        capability_registry.capabilities.clear()
+        capability_registry.register_capability(copy.copy(_BASELINE_CAPABILITY))
+        widget.capability_discovery.discovery_tasks.clear()
+        widget.discovery_tasks.clear()
+        
+        # 重置筛选条件、选择和详情
+        widget.search_input.clear()
+        widget.type_filter.setCurrentIndex(0)
+        widget.status_filter.setCurrentIndex(0)
+        widget.capability_table.clearSelection()
+        widget.clear_capability_details()
+        widget.refresh_capability_list()
+        
+        # 重置发现任务状态
+        widget.discovery_progress.reset()
+        widget.discovery_progress.setVisible(False)
+        widget.discover_btn.setEnabled(True)
+        widget.discovery_status_label.setText("没有运行中的发现任务")
+        return widget
     
     def test_initialization(self, capability_manager):
         """测试初始化"""
@@ -117,14 +160,16 @@ class TestCapabilityManager:
         
         # 测试类型筛选
         capability_manager.search_input.clear()
-        capability_manager.type_filter.setCurrentIndex(2)  # CODE_GENERATION
+        capability_manager.type_filter.setCurrentIndex(
+            capability_manager.type_filter.findData(CapabilityType.CODE_GENERATION))
         filtered = capability_manager.filter_capabilities(capability_registry.get_all_capabilities())
         assert len(filtered) == 1
         assert filtered[0].capability_type == CapabilityType.CODE_GENERATION
         
         # 测试状态筛选
         capability_manager.type_filter.setCurrentIndex(0)  # 所有类型
-        capability_manager.status_filter.setCurrentIndex(2)  # EXPERIMENTAL
+        capability_manager.status_filter.setCurrentIndex(
+            capability_manager.status_filter.findData(CapabilityStatus.EXPERIMENTAL))
         filtered = capability_manager.filter_capabilities(capability_registry.get_all_capabilities())
         assert len(filtered) == 1
         assert filtered[0].status == CapabilityStatus.EXPERIMENTAL
@@ -145,7 +190,7 @@ class TestCapabilityManager:
     def test_show_capability_details(self, capability_manager):
         """测试显示能力详情"""
         # 选择能力
-        capability_manager.capability_table.selectRow(0)
+        _select_first_capability(capability_manager)
         
         # 检查基本信息显示
         assert capability_manager.capability_id_label.text() == "test_capability_1"
@@ -169,10 +214,36 @@ class TestCapabilityManager:
         assert capability_manager.outputs_table.item(0, 1).text() == "string"
         assert capability_manager.outputs_table.item(0, 2).text() == "plain"
     
+    def test_show_tests(self, capability_manager):
+        """测试显示测试信息（表格和统计都按测试用例计算，取最近一次结果）"""
+        capability = copy.copy(_BASELINE_CAPABILITY)
+        capability.test_cases = [
+            CapabilityTest(test_id=test_id, name=test_id, description="",
+                           input_data={"prompt": test_id}, expected_output={})
+            for test_id in ("case_1", "case_2", "case_3")
+        ]
+        capability.test_results = [
+            CapabilityTestResult("case_1", capability.capability_id, "m", TestResult.FAILED),
+            CapabilityTestResult("case_1", capability.capability_id, "m", TestResult.PASSED,
+                                 actual_output={"text": "ok"}),
+            CapabilityTestResult("case_2", capability.capability_id, "m", TestResult.FAILED),
+        ]
+        
+        capability_manager.show_tests(capability)
+        
+        table = capability_manager.tests_table
+        assert table.rowCount() == 3
+        assert [table.item(row, 4).text() for row in range(3)] == ["passed", "failed", "未测试"]
+        assert table.item(0, 3).text() == str({"text": "ok"})
+        assert capability_manager.total_tests_label.text() == "总测试: 3"
+        assert capability_manager.passed_tests_label.text() == "通过: 1"
+        assert capability_manager.failed_tests_label.text() == "失败: 1"
+        assert capability_manager.success_rate_label.text() == "成功率: 33.3%"
+    
     def test_clear_capability_details(self, capability_manager):
         """测试清空能力详情"""
         # 先选择一个能力
-        capability_manager.capability_table.selectRow(0)
+        _select_first_capability(capability_manager)
         assert capability_manager.current_capability_id is not None
         
         # 清空详情
@@ -190,7 +261,7 @@ class TestCapabilityManager:
         assert capability_manager.edit_btn.isEnabled() is False
         assert capability_manager.delete_btn.isEnabled() is False
     
-    def test_delete_capability(self, capability_manager, capability_registry):
+    def test_delete_capability(self, capability_manager, capability_registry, monkeypatch):
         """测试删除能力"""
         # 选择能力
         capability_manager.capability_table.selectRow(0)
@@ -198,26 +269,35 @@ class TestCapabilityManager:
         # 检查能力存在
         assert capability_registry.get_capability("test_capability_1") is not None
         
-        # 使用patch模拟QMessageBox.question返回Yes
-        with patch('PyQt6.QtWidgets.QMessageBox.question', return_value=Mock(return_value=Mock(StandardButton.Yes))):
-            capability_manager.delete_capability()
+        # 确认对话框直接返回Yes，成功提示不弹出模态框
+        monkeypatch.setattr(QMessageBox, "question",
+                            lambda *args, **kwargs: QMessageBox.StandardButton.Yes)
+        monkeypatch.setattr(QMessageBox, "information", lambda *args, **kwargs: None)
+        capability_manager.delete_capability()
         
         # 检查能力已被删除
         assert capability_registry.get_capability("test_capability_1") is None
         assert capability_manager.capability_table.rowCount() == 0
     
-    def test_start_capability_discovery(self, capability_manager):
+    @pytest.mark.asyncio
+    async def test_start_capability_discovery(self, capability_manager, monkeypatch):
         """测试开始能力发现"""
-        # 使用patch模拟异步调用
-        with patch.object(capability_manager.capability_discovery, 'discover_model_capabilities', 
-                         new_callable=AsyncMock) as mock_discover:
-            mock_discover.return_value = "test_task_id"
-            
-            # 启动发现
-            capability_manager.start_capability_discovery()
-            
-            # 检查发现任务已启动
-            mock_discover.assert_called_once()
+        calls = []
+        
+        async def fake_discover(*args, **kwargs):
+            calls.append((args, kwargs))
+            return "test_task_id"
+        
+        monkeypatch.setattr(capability_manager.capability_discovery,
+                            "discover_model_capabilities", fake_discover)
+        
+        # 启动发现（内部通过asyncio.create_task调度，需在运行中的事件循环内调用）
+        capability_manager.start_capability_discovery()
+        await asyncio.sleep(0)
+        
+        # 检查发现任务已启动
+        assert len(calls) == 1
+        assert capability_manager.discovery_tasks == {"test_task_id": "test_model_1"}
     
     def test_update_discovery_status(self, capability_manager):
         """测试更新发现任务状态"""
@@ -236,27 +316,26 @@ class TestCapabilityManager:
             
             # 检查进度条状态
             assert capability_manager.discovery_progress.value() == 50
-            assert capability_manager.discovery_progress.isVisible() is True
+            # 共享界面未调用show()，isVisible()恒为False，这里检查控件自身未被隐藏
+            assert capability_manager.discovery_progress.isHidden() is False
             assert "test_task" in capability_manager.discovery_status_label.text()
     
-    def test_on_discovery_started(self, capability_manager):
-        """测试发现任务开始"""
-        capability_manager.on_discovery_started("test_task_id")
-        
-        # 检查界面状态
-        assert capability_manager.discovery_progress.isVisible() is True
-        assert capability_manager.discovery_progress.value() == 0
-        assert capability_manager.discover_btn.isEnabled() is False
-        assert "test_task_id" in capability_manager.discovery_status_label.text()
-    
-    def test_on_discovery_completed(self, capability_manager):
-        """测试发现任务完成"""
-        capability_manager.on_discovery_completed("test_task_id")
+    @pytest.mark.parametrize("method,arg,expected_val,expected_enabled,expected_visible", [
+        ("on_discovery_started", "task_a", 0, False, True),
+        # 完成后进度条由定时器延迟隐藏，不检查可见性
+        ("on_discovery_completed", "task_b", 100, True, None),
+    ])
+    def test_discovery_callbacks(self, capability_manager, method, arg,
+                                 expected_val, expected_enabled, expected_visible):
+        """测试发现任务开始/完成回调"""
+        getattr(capability_manager, method)(arg)
         
         # 检查界面状态
-        assert capability_manager.discovery_progress.value() == 100
-        assert capability_manager.discover_btn.isEnabled() is True
-        assert "test_task_id" in capability_manager.discovery_status_label.text()
+        assert capability_manager.discovery_progress.value() == expected_val
+        assert capability_manager.discover_btn.isEnabled() is expected_enabled
+        assert arg in capability_manager.discovery_status_label.text()
+        if expected_visible is not None:
+            assert (not capability_manager.discovery_progress.isHidden()) is expected_visible
 
 
 # 运行测试
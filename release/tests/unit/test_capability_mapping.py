@@ -3,13 +3,8 @@
 测试能力与模型关联管理的功能
 """
 
+import copy
 import pytest
-import sys
-import os
-from unittest.mock import Mock, AsyncMock, patch
-
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 from src.core.capability_mapping import (
     CapabilityMappingManager, ModelCapabilityMapping, CapabilityMappingResult,
@@ -20,56 +15,89 @@ from src.core.capability_model import (
     CapabilityParameter, CapabilityOutput
 )
 
+# 断言中反复使用的枚举值
+TEXT_GEN = CapabilityType.TEXT_GENERATION
+AVAIL = CapabilityStatus.AVAILABLE
+
+
+class _Stub:
+    """占位对象，映射管理器只保存模型管理器引用，不调用其方法"""
+    __slots__ = ()
+
+
+def _subset(obj, keys):
+    """取对象的指定属性组成字典，便于一次断言多个字段"""
+    return {key: getattr(obj, key) for key in keys}
+
+
+def _set_stats(mapping, usage_count, success_rate, avg_response_time):
+    """直接写入映射的累计统计，代替逐次调用update_mapping_stats构造前置状态"""
+    mapping.usage_count = usage_count
+    mapping.success_rate = success_rate
+    mapping.avg_response_time = avg_response_time
+
+
+@pytest.fixture(scope="session")
+def _capability_registry_template():
+    """构建包含测试能力的注册表模板（会话内只构建一次）"""
+    registry = CapabilityRegistry()
+    
+    # 添加测试能力
+    test_capability = Capability(
+        capability_id="test_capability_1",
+        name="测试能力1",
+        description="这是一个测试能力",
+        capability_type=TEXT_GEN,
+        parameters=[
+            CapabilityParameter(
+                name="prompt",
+                type="string",
+                description="输入提示",
+                required=True
+            )
+        ],
+        outputs=[
+            CapabilityOutput(
+                name="generated_text",
+                type="string",
+                description="生成的文本",
+                format="plain"
+            )
+        ],
+        tags=["test", "text"],
+        category="text_processing",
+        complexity=2
+    )
+    
+    registry.register_capability(test_capability)
+    return registry
+
 
 class TestCapabilityMapping:
     """能力映射测试类"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_model_manager(self):
-        """创建模拟的模型管理器"""
-        mock_manager = Mock()
-        return mock_manager
+        """创建模拟的模型管理器（模块内共享，测试不检查其调用记录）"""
+        return _Stub()
     
     @pytest.fixture
-    def capability_registry(self):
-        """创建能力注册表"""
-        registry = CapabilityRegistry()
-        
-        # 添加测试能力
-        test_capability = Capability(
-            capability_id="test_capability_1",
-            name="测试能力1",
-            description="这是一个测试能力",
-            capability_type=CapabilityType.TEXT_GENERATION,
-            parameters=[
-                CapabilityParameter(
-                    name="prompt",
-                    type="string",
-                    description="输入提示",
-                    required=True
-                )
-            ],
-            outputs=[
-                CapabilityOutput(
-                    name="generated_text",
-                    type="string",
-                    description="生成的文本",
-                    format="plain"
-                )
-            ],
-            tags=["test", "text"],
-            category="text_processing",
-            complexity=2
-        )
-        
-        registry.register_capability(test_capability)
-        return registry
+    def capability_registry(self, _capability_registry_template):
+        """创建能力注册表（模板的深拷贝，各测试互不影响）"""
+        return copy.deepcopy(_capability_registry_template)
     
     @pytest.fixture
     def mapping_manager(self, mock_model_manager, capability_registry):
         """创建能力映射管理器"""
         return CapabilityMappingManager(mock_model_manager, capability_registry)
     
+    @pytest.fixture
+    def manager_with_two_mappings(self, mapping_manager):
+        """创建已添加两个模型映射到test_capability_1的映射管理器"""
+        mapping_id1 = mapping_manager.add_mapping("test_model_1", "test_capability_1")
+        mapping_id2 = mapping_manager.add_mapping("test_model_2", "test_capability_1")
+        return mapping_manager, mapping_id1, mapping_id2
+    
     def test_initialization(self, mapping_manager):
         """测试初始化"""
         assert mapping_manager is not None
@@ -77,8 +105,13 @@ class TestCapabilityMapping:
         assert mapping_manager.capability_registry is not None
         assert mapping_manager.mappings == {}
     
-    def test_add_mapping(self, mapping_manager, capability_registry):
+    def test_add_mapping(self, mapping_manager, capability_registry, _capability_registry_template):
         """测试添加能力映射"""
+        # 每个测试使用独立的注册表，修改不会影响会话模板
+        assert capability_registry is not _capability_registry_template
+        assert (capability_registry.get_capability("test_capability_1")
+                is not _capability_registry_template.get_capability("test_capability_1"))
+        
         mapping_id = mapping_manager.add_mapping(
             "test_model_1", 
             "test_capability_1", 
@@ -92,12 +125,15 @@ class TestCapabilityMapping:
         
         mapping = mapping_manager.get_mapping_by_id(mapping_id)
         assert mapping is not None
-        assert mapping.model_id == "test_model_1"
-        assert mapping.capability_id == "test_capability_1"
-        assert mapping.capability_type == CapabilityType.TEXT_GENERATION
-        assert mapping.priority == 5
-        assert mapping.metadata == {"test": "data"}
-        assert mapping.status == CapabilityStatus.AVAILABLE
+        expected = {
+            "model_id": "test_model_1",
+            "capability_id": "test_capability_1",
+            "capability_type": TEXT_GEN,
+            "priority": 5,
+            "metadata": {"test": "data"},
+            "status": AVAIL
+        }
+        assert _subset(mapping, expected) == expected
     
     def test_add_mapping_invalid_capability(self, mapping_manager):
         """测试添加无效能力的映射"""
@@ -125,11 +161,9 @@ class TestCapabilityMapping:
         result = mapping_manager.remove_mapping("nonexistent_mapping")
         assert result is False
     
-    def test_get_mappings_for_capability(self, mapping_manager):
+    def test_get_mappings_for_capability(self, manager_with_two_mappings):
         """测试获取指定能力的映射"""
-        # 添加多个映射
-        mapping_id1 = mapping_manager.add_mapping("test_model_1", "test_capability_1")
-        mapping_id2 = mapping_manager.add_mapping("test_model_2", "test_capability_1")
+        mapping_manager, mapping_id1, mapping_id2 = manager_with_two_mappings
         
         # 获取映射
         mappings = mapping_manager.get_mappings_for_capability("test_capability_1")
@@ -162,20 +196,22 @@ class TestCapabilityMapping:
         
         # 初始状态检查
         mapping = mapping_manager.get_mapping_by_id(mapping_id)
-        assert mapping.usage_count == 0
-        assert mapping.success_rate == 0.0
-        assert mapping.avg_response_time == 0.0
+        expected = {"usage_count": 0, "success_rate": 0.0, "avg_response_time": 0.0}
+        assert _subset(mapping, expected) == expected
         
         # 更新统计信息
         mapping_manager.update_mapping_stats(mapping_id, True, 100.0, 0.01)
         
         # 检查更新后的状态
         updated_mapping = mapping_manager.get_mapping_by_id(mapping_id)
-        assert updated_mapping.usage_count == 1
-        assert updated_mapping.success_rate == 1.0
-        assert updated_mapping.avg_response_time == 100.0
-        assert updated_mapping.cost_per_request == 0.01
-        assert updated_mapping.status == CapabilityStatus.AVAILABLE
+        expected = {
+            "usage_count": 1,
+            "success_rate": 1.0,
+            "avg_response_time": 100.0,
+            "cost_per_request": 0.01,
+            "status": AVAIL
+        }
+        assert _subset(updated_mapping, expected) == expected
     
     def test_update_mapping_stats_multiple(self, mapping_manager):
         """测试多次更新映射统计信息"""
@@ -190,79 +226,38 @@ class TestCapabilityMapping:
         # 检查统计信息
         mapping = mapping_manager.get_mapping_by_id(mapping_id)
         assert mapping.usage_count == 3
-        assert mapping.success_rate == pytest.approx(2/3, 0.01)  # 2/3成功率
-        assert mapping.avg_response_time == pytest.approx(150.0, 0.01)  # 平均响应时间
+        # 2/3成功率、平均响应时间
+        assert (mapping.success_rate, mapping.avg_response_time) == pytest.approx((2/3, 150.0), rel=0.01)
     
-    def test_map_capability_to_model_best_match(self, mapping_manager):
-        """测试最佳匹配策略"""
-        # 添加多个映射
-        mapping_id1 = mapping_manager.add_mapping("test_model_1", "test_capability_1", priority=5)
-        mapping_id2 = mapping_manager.add_mapping("test_model_2", "test_capability_1", priority=8)
-        
-        # 更新统计信息，使第二个映射更优
-        mapping_manager.update_mapping_stats(mapping_id1, True, 200.0, 0.02)
-        mapping_manager.update_mapping_stats(mapping_id2, True, 100.0, 0.01)
-        
-        # 测试最佳匹配
-        result = mapping_manager.map_capability_to_model(
-            "test_capability_1", 
-            strategy=MappingStrategy.BEST_MATCH
-        )
+    @pytest.mark.parametrize("strategy,priorities,stats,expected_model", [
+        # 第二个映射优先级更高、响应时间更短
+        (MappingStrategy.BEST_MATCH, (5, 8), [(True, 200.0, 0.02), (True, 100.0, 0.01)], "test_model_2"),
+        # 第二个映射响应时间更短
+        (MappingStrategy.FASTEST, (1, 1), [(True, 300.0, 0.0), (True, 100.0, 0.0)], "test_model_2"),
+        # 第二个映射成本更低
+        (MappingStrategy.LOWEST_COST, (1, 1), [(True, 100.0, 0.05), (True, 100.0, 0.01)], "test_model_2"),
+    ])
+    def test_map_capability_to_model(self, manager_with_two_mappings, strategy, priorities, stats, expected_model):
+        """测试按策略选择模型"""
+        mapping_manager, *mapping_ids = manager_with_two_mappings
+        
+        # 设置优先级并更新统计信息
+        for mapping_id, priority, (success, response_time, cost) in zip(mapping_ids, priorities, stats):
+            mapping_manager.get_mapping_by_id(mapping_id).priority = priority
+            mapping_manager.update_mapping_stats(mapping_id, success, response_time, cost)
+        
+        result = mapping_manager.map_capability_to_model("test_capability_1", strategy=strategy)
         
         # 检查结果
         assert result is not None
         assert result.capability_id == "test_capability_1"
-        assert result.model_id == "test_model_2"  # 应该选择优先级更高、响应时间更短的模型
-        assert result.strategy == MappingStrategy.BEST_MATCH
+        assert result.model_id == expected_model
+        assert result.strategy == strategy
         assert result.confidence > 0
     
-    def test_map_capability_to_model_fastest(self, mapping_manager):
-        """测试最快响应策略"""
-        # 添加多个映射
-        mapping_id1 = mapping_manager.add_mapping("test_model_1", "test_capability_1")
-        mapping_id2 = mapping_manager.add_mapping("test_model_2", "test_capability_1")
-        
-        # 更新响应时间
-        mapping_manager.update_mapping_stats(mapping_id1, True, 300.0)
-        mapping_manager.update_mapping_stats(mapping_id2, True, 100.0)
-        
-        # 测试最快响应策略
-        result = mapping_manager.map_capability_to_model(
-            "test_capability_1", 
-            strategy=MappingStrategy.FASTEST
-        )
-        
-        # 检查结果
-        assert result is not None
-        assert result.model_id == "test_model_2"  # 应该选择响应时间更短的模型
-        assert result.strategy == MappingStrategy.FASTEST
-    
-    def test_map_capability_to_model_lowest_cost(self, mapping_manager):
-        """测试最低成本策略"""
-        # 添加多个映射
-        mapping_id1 = mapping_manager.add_mapping("test_model_1", "test_capability_1")
-        mapping_id2 = mapping_manager.add_mapping("test_model_2", "test_capability_1")
-        
-        # 更新成本
-        mapping_manager.update_mapping_stats(mapping_id1, True, 100.0, 0.05)
-        mapping_manager.update_mapping_stats(mapping_id2, True, 100.0, 0.01)
-        
-        # 测试最低成本策略
-        result = mapping_manager.map_capability_to_model(
-            "test_capability_1", 
-            strategy=MappingStrategy.LOWEST_COST
-        )
-        
-        # 检查结果
-        assert result is not None
-        assert result.model_id == "test_model_2"  # 应该选择成本更低的模型
-        assert result.strategy == MappingStrategy.LOWEST_COST
-    
-    def test_map_capability_to_model_round_robin(self, mapping_manager):
+    def test_map_capability_to_model_round_robin(self, manager_with_two_mappings):
         """测试轮询策略"""
-        # 添加多个映射
-        mapping_id1 = mapping_manager.add_mapping("test_model_1", "test_capability_1")
-        mapping_id2 = mapping_manager.add_mapping("test_model_2", "test_capability_1")
+        mapping_manager, _, _ = manager_with_two_mappings
         
         # 测试轮询策略
         result1 = mapping_manager.map_capability_to_model(
@@ -292,31 +287,29 @@ class TestCapabilityMapping:
         # 添加映射但设置为不可用
         mapping_id = mapping_manager.add_mapping("test_model_1", "test_capability_1")
         
-        # 多次更新统计信息使成功率低于20%，变为不可用状态
-        for _ in range(5):
-            mapping_manager.update_mapping_stats(mapping_id, False, 100.0)
+        # 直接设置前4次均失败的统计，再更新一次使成功率低于20%，变为不可用状态
+        mapping = mapping_manager.get_mapping_by_id(mapping_id)
+        _set_stats(mapping, 4, 0.0, 100.0)
+        mapping_manager.update_mapping_stats(mapping_id, False, 100.0)
         
         # 检查状态变为不可用
-        mapping = mapping_manager.get_mapping_by_id(mapping_id)
+        assert mapping.usage_count == 5
         assert mapping.status == CapabilityStatus.UNAVAILABLE
         
         # 测试映射
         result = mapping_manager.map_capability_to_model("test_capability_1")
         assert result is None
     
-    def test_get_mapping_statistics(self, mapping_manager):
+    def test_get_mapping_statistics(self, manager_with_two_mappings):
         """测试获取映射统计信息"""
-        # 添加多个映射
-        mapping_id1 = mapping_manager.add_mapping("test_model_1", "test_capability_1")
-        mapping_id2 = mapping_manager.add_mapping("test_model_2", "test_capability_1")
+        mapping_manager, mapping_id1, mapping_id2 = manager_with_two_mappings
         
         # 更新统计信息
         mapping_manager.update_mapping_stats(mapping_id1, True, 100.0)
         
-        # 更新第二个映射使其变为降级状态（成功率在0.2-0.5之间）
-        mapping_manager.update_mapping_stats(mapping_id2, True, 200.0)  # 第一次成功
-        mapping_manager.update_mapping_stats(mapping_id2, False, 200.0)  # 第二次失败
-        mapping_manager.update_mapping_stats(mapping_id2, False, 200.0)  # 第三次失败
+        # 第二个映射已有一次成功一次失败，第三次失败后变为降级状态（成功率在0.2-0.5之间）
+        _set_stats(mapping_manager.get_mapping_by_id(mapping_id2), 2, 0.5, 200.0)
+        mapping_manager.update_mapping_stats(mapping_id2, False, 200.0)
         
         # 获取统计信息
         stats = mapping_manager.get_mapping_statistics()
@@ -330,8 +323,8 @@ class TestCapabilityMapping:
         assert "text_generation" in stats["type_statistics"]
         assert stats["type_statistics"]["text_generation"] == 2
     
-    def test_export_import_mappings(self, mapping_manager):
-        """测试导出和导入映射"""
+    def test_export_mappings(self, mapping_manager):
+        """测试导出映射"""
         # 添加映射
         mapping_id = mapping_manager.add_mapping("test_model_1", "test_capability_1", priority=5)
         mapping_manager.update_mapping_stats(mapping_id, True, 100.0, 0.01)
@@ -342,30 +335,50 @@ class TestCapabilityMapping:
         # 检查导出数据
         assert len(exported_data) == 1
         mapping_data = exported_data[0]
-        assert mapping_data["mapping_id"] == mapping_id
-        assert mapping_data["model_id"] == "test_model_1"
-        assert mapping_data["capability_id"] == "test_capability_1"
-        assert mapping_data["priority"] == 5
-        assert mapping_data["success_rate"] == 1.0
-        assert mapping_data["avg_response_time"] == 100.0
-        assert mapping_data["cost_per_request"] == 0.01
-        
-        # 创建新的映射管理器并导入数据
-        new_mapping_manager = CapabilityMappingManager(
-            Mock(),  # 模拟模型管理器
-            Mock()   # 模拟能力注册表
-        )
-        new_mapping_manager.import_mappings(exported_data)
+        expected = {
+            "mapping_id": mapping_id,
+            "model_id": "test_model_1",
+            "capability_id": "test_capability_1",
+            "capability_type": "text_generation",
+            "priority": 5,
+            "success_rate": 1.0,
+            "avg_response_time": 100.0,
+            "cost_per_request": 0.01,
+            "usage_count": 1,
+            "status": "available"
+        }
+        assert {key: mapping_data[key] for key in expected} == expected
+    
+    def test_import_mappings(self, mapping_manager):
+        """测试导入映射"""
+        mapping_manager.import_mappings([{
+            "mapping_id": "imported_mapping",
+            "model_id": "test_model_1",
+            "capability_id": "test_capability_1",
+            "capability_type": "text_generation",
+            "priority": 5,
+            "success_rate": 1.0,
+            "avg_response_time": 100.0,
+            "cost_per_request": 0.01,
+            "usage_count": 1,
+            "status": "available"
+        }])
         
         # 检查导入结果
-        imported_mapping = new_mapping_manager.get_mapping_by_id(mapping_id)
+        imported_mapping = mapping_manager.get_mapping_by_id("imported_mapping")
         assert imported_mapping is not None
-        assert imported_mapping.model_id == "test_model_1"
-        assert imported_mapping.capability_id == "test_capability_1"
-        assert imported_mapping.priority == 5
-        assert imported_mapping.success_rate == 1.0
-        assert imported_mapping.avg_response_time == 100.0
-        assert imported_mapping.cost_per_request == 0.01
+        expected = {
+            "model_id": "test_model_1",
+            "capability_id": "test_capability_1",
+            "capability_type": TEXT_GEN,
+            "priority": 5,
+            "success_rate": 1.0,
+            "avg_response_time": 100.0,
+            "cost_per_request": 0.01,
+            "usage_count": 1,
+            "status": AVAIL
+        }
+        assert _subset(imported_mapping, expected) == expected
 
 
 # 运行测试
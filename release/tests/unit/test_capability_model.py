@@ -3,12 +3,8 @@
 测试能力数据模型的基础功能
 """
 
+import copy
 import pytest
-import sys
-import os
-
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 from src.core.capability_model import (
     Capability, CapabilityType, CapabilityStatus, TestResult,
@@ -16,46 +12,75 @@ from src.core.capability_model import (
     CapabilityRegistry, create_standard_capabilities
 )
 
+# 断言中反复使用的枚举值
+TEXT_GEN = CapabilityType.TEXT_GENERATION
+AVAIL = CapabilityStatus.AVAILABLE
+PASSED = TestResult.PASSED
+
+
+@pytest.fixture(scope="session")
+def _sample_capability_template():
+    """创建示例能力模板（会话内只构建一次）"""
+    return Capability(
+        capability_id="test_capability_v1",
+        name="测试能力",
+        description="这是一个测试能力",
+        capability_type=TEXT_GEN,
+        parameters=[
+            CapabilityParameter(
+                name="input_text",
+                type="string",
+                description="输入文本",
+                required=True
+            ),
+            CapabilityParameter(
+                name="max_length",
+                type="number",
+                description="最大长度",
+                required=False,
+                default_value=100,
+                constraints={"min": 1, "max": 1000}
+            )
+        ],
+        outputs=[
+            CapabilityOutput(
+                name="output_text",
+                type="string",
+                description="输出文本",
+                format="plain"
+            )
+        ],
+        tags=["test", "text"],
+        category="testing",
+        complexity=2
+    )
+
+
+@pytest.fixture(scope="session")
+def standard_capabilities():
+    """创建标准能力注册表（会话内共享，使用方不得修改）"""
+    return create_standard_capabilities()
+
 
 class TestCapabilityModel:
     """能力数据模型测试类"""
     
     @pytest.fixture
-    def sample_capability(self):
-        """创建示例能力"""
-        return Capability(
-            capability_id="test_capability_v1",
-            name="测试能力",
-            description="这是一个测试能力",
-            capability_type=CapabilityType.TEXT_GENERATION,
-            parameters=[
-                CapabilityParameter(
-                    name="input_text",
-                    type="string",
-                    description="输入文本",
-                    required=True
-                ),
-                CapabilityParameter(
-                    name="max_length",
-                    type="number",
-                    description="最大长度",
-                    required=False,
-                    default_value=100,
-                    constraints={"min": 1, "max": 1000}
-                )
-            ],
-            outputs=[
-                CapabilityOutput(
-                    name="output_text",
-                    type="string",
-                    description="输出文本",
-                    format="plain"
-                )
-            ],
-            tags=["test", "text"],
-            category="testing",
-            complexity=2
-        )
+    def sample_capability_ro(self, _sample_capability_template):
+        """获取只读示例能力（共享模板，测试不得修改）"""
+        return _sample_capability_template
+    
+    @pytest.fixture
+    def sample_capability(self, _sample_capability_template):
+        """创建示例能力（模板的深拷贝，可在测试中修改）"""
+        return copy.deepcopy(_sample_capability_template)
+    
+    @pytest.fixture
+    def registry_with_sample(self, sample_capability):
+        """创建已注册示例能力的注册表"""
+        registry = CapabilityRegistry()
+        registry.register_capability(sample_capability)
+        return registry
     
     @pytest.fixture
     def sample_test(self):
@@ -71,20 +96,20 @@ class TestCapabilityModel:
             tags=["basic"]
         )
     
-    def test_capability_creation(self, sample_capability):
+    def test_capability_creation(self, sample_capability_ro):
         """测试能力创建"""
-        assert sample_capability.capability_id == "test_capability_v1"
-        assert sample_capability.name == "测试能力"
-        assert sample_capability.capability_type == CapabilityType.TEXT_GENERATION
-        assert sample_capability.status == CapabilityStatus.AVAILABLE
-        assert len(sample_capability.parameters) == 2
-        assert len(sample_capability.outputs) == 1
-        assert sample_capability.complexity == 2
+        assert sample_capability_ro.capability_id == "test_capability_v1"
+        assert sample_capability_ro.name == "测试能力"
+        assert sample_capability_ro.capability_type == TEXT_GEN
+        assert sample_capability_ro.status == AVAIL
+        assert len(sample_capability_ro.parameters) == 2
+        assert len(sample_capability_ro.outputs) == 1
+        assert sample_capability_ro.complexity == 2
     
-    def test_capability_serialization(self, sample_capability):
+    def test_capability_serialization(self, sample_capability_ro):
         """测试能力序列化"""
         # 转换为字典
-        capability_dict = sample_capability.to_dict()
+        capability_dict = sample_capability_ro.to_dict()
         
         assert capability_dict["capability_id"] == "test_capability_v1"
         assert capability_dict["name"] == "测试能力"
@@ -96,29 +121,47 @@ class TestCapabilityModel:
         # 从字典恢复
         restored_capability = Capability.from_dict(capability_dict)
         
-        assert restored_capability.capability_id == sample_capability.capability_id
-        assert restored_capability.name == sample_capability.name
-        assert restored_capability.capability_type == sample_capability.capability_type
-        assert len(restored_capability.parameters) == len(sample_capability.parameters)
-        assert len(restored_capability.outputs) == len(sample_capability.outputs)
+        assert restored_capability.capability_id == sample_capability_ro.capability_id
+        assert restored_capability.name == sample_capability_ro.name
+        assert restored_capability.capability_type == sample_capability_ro.capability_type
+        assert len(restored_capability.parameters) == len(sample_capability_ro.parameters)
+        assert len(restored_capability.outputs) == len(sample_capability_ro.outputs)
+    
+    def test_capability_to_dict_reflects_changes(self, sample_capability, sample_test):
+        """测试字典表示反映能力的最新状态"""
+        first = sample_capability.to_dict()
+        assert sample_capability.to_dict() == first
+        assert first["test_cases"] == []
+        
+        # 修改方法、直接赋值和原地修改列表后都能得到最新结果
+        sample_capability.add_test_case(sample_test)
+        assert [t["test_id"] for t in sample_capability.to_dict()["test_cases"]] == ["test_1"]
+        
+        sample_capability.status = CapabilityStatus.DEPRECATED
+        assert sample_capability.to_dict()["status"] == "deprecated"
+        
+        sample_capability.parameters.append(
+            CapabilityParameter(name="extra", type="string", description="额外参数")
+        )
+        assert sample_capability.to_dict()["parameters"][-1]["name"] == "extra"
     
-    def test_capability_input_validation(self, sample_capability):
+    def test_capability_input_validation(self, sample_capability_ro):
         """测试输入验证"""
         # 有效输入
         valid_input = {"input_text": "测试文本", "max_length": 200}
-        assert sample_capability.validate_input(valid_input) is True
+        assert sample_capability_ro.validate_input(valid_input) is True
         
         # 无效输入 - 缺少必需参数
         invalid_input_missing = {"max_length": 200}
-        assert sample_capability.validate_input(invalid_input_missing) is False
+        assert sample_capability_ro.validate_input(invalid_input_missing) is False
         
         # 无效输入 - 参数类型错误
         invalid_input_type = {"input_text": "测试文本", "max_length": "invalid"}
-        assert sample_capability.validate_input(invalid_input_type) is False
+        assert sample_capability_ro.validate_input(invalid_input_type) is False
         
         # 无效输入 - 超出约束范围
         invalid_input_constraint = {"input_text": "测试文本", "max_length": 2000}
-        assert sample_capability.validate_input(invalid_input_constraint) is False
+        assert sample_capability_ro.validate_input(invalid_input_constraint) is False
     
     def test_capability_test_management(self, sample_capability, sample_test):
         """测试测试用例管理"""
@@ -133,7 +176,7 @@ class TestCapabilityModel:
             test_id="test_1",
             capability_id="test_capability_v1",
             model_id="test_model",
-            result=TestResult.PASSED,
+            result=PASSED,
             actual_output={"output_text": "测试输出"},
             execution_time=1.5
         )
@@ -141,7 +184,7 @@ class TestCapabilityModel:
         sample_capability.add_test_result(test_result)
         
         assert len(sample_capability.test_results) == 1
-        assert sample_capability.test_results[0].result == TestResult.PASSED
+        assert sample_capability.test_results[0].result == PASSED
         
         # 验证统计信息更新
         stats = sample_capability.get_statistics()
@@ -149,13 +192,13 @@ class TestCapabilityModel:
         assert stats["success_rate"] == 1.0
         assert stats["average_response_time"] == 1.5
     
-    def test_capability_registry(self, sample_capability):
+    def test_capability_registry(self, registry_with_sample, sample_capability):
         """测试能力注册表"""
-        registry = CapabilityRegistry()
+        registry = registry_with_sample
         
-        # 注册能力
-        assert registry.register_capability(sample_capability) is True
+        # 已注册能力
         assert registry.get_capability_count() == 1
+        assert registry.get_capability("test_capability_v1") is sample_capability
         
         # 重复注册
         assert registry.register_capability(sample_capability) is False
@@ -172,13 +215,12 @@ class TestCapabilityModel:
         # 注销不存在的能力
         assert registry.unregister_capability("nonexistent") is False
     
-    def test_capability_search(self, sample_capability):
+    def test_capability_search(self, registry_with_sample):
         """测试能力搜索"""
-        registry = CapabilityRegistry()
-        registry.register_capability(sample_capability)
+        registry = registry_with_sample
         
         # 按类型搜索
-        text_caps = registry.get_capabilities_by_type(CapabilityType.TEXT_GENERATION)
+        text_caps = registry.get_capabilities_by_type(TEXT_GEN)
         assert len(text_caps) == 1
         
         # 按分类搜索
@@ -196,9 +238,9 @@ class TestCapabilityModel:
         search_results = registry.search_capabilities("text")
         assert len(search_results) == 1
     
-    def test_standard_capabilities(self):
+    def test_standard_capabilities(self, standard_capabilities):
         """测试标准能力"""
-        registry = create_standard_capabilities()
+        registry = standard_capabilities
         
         assert registry.get_capability_count() == 3
         
@@ -206,7 +248,7 @@ class TestCapabilityModel:
         text_gen = registry.get_capability("text_generation_v1")
         assert text_gen is not None
         assert text_gen.name == "文本生成"
-        assert text_gen.capability_type == CapabilityType.TEXT_GENERATION
+        assert text_gen.capability_type == TEXT_GEN
         
         # 验证代码生成能力
         code_gen = registry.get_capability("code_generation_v1")
@@ -228,7 +270,7 @@ class TestCapabilityModel:
                 test_id=f"test_{i}",
                 capability_id="test_capability_v1",
                 model_id="test_model",
-                result=TestResult.PASSED if i < 2 else TestResult.FAILED,
+                result=PASSED if i < 2 else TestResult.FAILED,
                 execution_time=1.0 + i * 0.5
             )
             sample_capability.add_test_result(result)
@@ -236,9 +278,9 @@ class TestCapabilityModel:
         stats = sample_capability.get_statistics()
         
         assert stats["usage_count"] == 2  # 只有PASSED结果计入使用次数
-        assert stats["success_rate"] == 2/3  # 2个通过，1个失败
-        assert stats["average_response_time"] == (1.0 + 1.5) / 2  # 平均响应时间
         assert stats["test_count"] == 0  # 测试用例数量（未添加测试用例）
+        # 2个通过1个失败的成功率、通过结果的平均响应时间
+        assert (stats["success_rate"], stats["average_response_time"]) == pytest.approx((2/3, (1.0 + 1.5) / 2))
         
         # 验证测试结果统计
         test_results = stats["test_results"]
@@ -4,32 +4,126 @@
 """
 
 import pytest
-import sys
-import os
 import asyncio
-import time
-from unittest.mock import Mock, AsyncMock, patch
+import copy
+import dataclasses
+from typing import TYPE_CHECKING
 
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+# 优化器模块依赖能力发现和适配器，导入较重，推迟到夹具中按需导入；
+# 这样用 -k 等方式排除本文件的测试时无需加载它
+if TYPE_CHECKING:
+    from src.core.capability_test_optimizer import CapabilityTestOptimizer, TestBatchResult
 
-from src.core.capability_test_optimizer import (
-    CapabilityTestOptimizer, TestOptimizationConfig, TestOptimizationStrategy,
-    TestPriority, TestBatchResult, PerformanceMetrics
-)
 from src.core.capability_model import (
     Capability, CapabilityType, CapabilityRegistry,
     CapabilityParameter, CapabilityOutput, CapabilityTest, TestResult, CapabilityTestResult
 )
-from src.core.capability_discovery import CapabilityDiscovery
+
+# 基准测试结果，其他结果通过 dataclasses.replace 派生；模拟的发现器按引用返回（测试只统计数量）
+BASE_RESULT = CapabilityTestResult(
+    test_id="test_1",
+    capability_id="test_capability_1",
+    model_id="test_model_1",
+    result=TestResult.PASSED,
+    actual_output={"generated_text": "回复1"},
+    error_message=None,
+    execution_time=100.0,
+    timestamp=0.0
+)
+_FAIL_RESULT = dataclasses.replace(
+    BASE_RESULT,
+    test_id="test_2",
+    result=TestResult.FAILED,
+    actual_output={},
+    error_message="超时错误",
+    execution_time=200.0
+)
+
+# 两次更新性能指标（10个测试成功8个/1000ms，5个测试成功5个/800ms）后的期望合并值
+EXPECTED_SUCCESS_RATE = 13 / 15
+EXPECTED_AVG_RT = (1000 * 10 + 800 * 5) / 15
+
+# 各优化策略的参数化用例：(策略取值, 期望包含的测试名称, 测试数量上限)
+# 默认只运行第一个代表性策略，传入 --all-strategies 时运行全部
+_STRATEGY_CASES = [
+    pytest.param("comprehensive", "文本生成测试", None, id="comprehensive"),
+    pytest.param("performance", "性能基准测试", None, id="performance"),
+    pytest.param("cost_effective", "成本效益测试", None, id="cost_effective"),
+    pytest.param("minimal", None, 1, id="minimal"),  # 最小化策略应该只有1个测试
+    pytest.param("adaptive", None, None, id="adaptive"),
+]
+
+
+def pytest_generate_tests(metafunc):
+    """按 --all-strategies 选项生成优化策略参数化用例"""
+    if "strategy" in metafunc.fixturenames:
+        cases = _STRATEGY_CASES if metafunc.config.getoption("--all-strategies") else _STRATEGY_CASES[:1]
+        metafunc.parametrize("strategy,expected,cap", cases)
+
+
+def _make_batch_result(**overrides) -> "TestBatchResult":
+    """创建测试批次结果，关键字参数覆盖默认字段"""
+    from src.core.capability_test_optimizer import TestBatchResult
+    
+    fields = dict(
+        batch_id="test_batch_1",
+        capability_id="test_capability_1",
+        model_id="test_model_1",
+        total_tests=5,
+        successful_tests=4,
+        failed_tests=1,
+        avg_response_time=1000.0,
+        total_cost=0.05,
+        start_time=1000.0,
+        end_time=1100.0,
+        test_results=[],
+        optimization_suggestions=[]
+    )
+    fields.update(overrides)
+    return TestBatchResult(**fields)
+
+
+class _FakeDiscovery:
+    """能力发现器的轻量替身，只实现优化器用到的 test_capability_on_model"""
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        """清除设置的返回值、副作用函数和调用记录"""
+        self._next = None
+        self._side_effect = None
+        self._calls = []
+    
+    def set_return(self, result):
+        """设置每次调用返回的结果"""
+        self._next = result
+    
+    def set_side_effect(self, fn):
+        """设置按调用参数计算结果的函数，优先于固定返回值"""
+        self._side_effect = fn
+    
+    async def test_capability_on_model(self, *args, **kwargs):
+        self._calls.append((args, kwargs))
+        if self._side_effect is not None:
+            return self._side_effect(*args, **kwargs)
+        return self._next
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    """模块内的异步测试共享同一个事件循环"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
 
 
 class TestCapabilityTestOptimizer:
     """能力测试优化器测试类"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def capability_registry(self):
-        """创建能力注册表"""
+        """创建能力注册表（类内共享，测试只读取其中的能力）"""
         registry = CapabilityRegistry()
         
         # 添加测试能力
@@ -74,18 +168,36 @@ class TestCapabilityTestOptimizer:
         registry.register_capability(test_capability)
         return registry
     
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def capability_discovery(self):
-        """创建能力发现器"""
-        discovery = Mock(spec=CapabilityDiscovery)
-        discovery.test_capability_on_model = AsyncMock()
-        return discovery
+        """创建能力发现器（类内共享，每个测试结束后由 _restore_optimizer_state 重置）"""
+        return _FakeDiscovery()
     
-    @pytest.fixture
-    def test_optimizer(self, capability_registry, capability_discovery):
-        """创建能力测试优化器"""
+    @pytest.fixture(scope="class")
+    def test_optimizer(self, capability_registry, capability_discovery) -> "CapabilityTestOptimizer":
+        """创建能力测试优化器（类内共享，每个测试结束后由 _restore_optimizer_state 恢复状态）"""
+        from src.core.capability_test_optimizer import CapabilityTestOptimizer
+        
         return CapabilityTestOptimizer(capability_registry, capability_discovery)
     
+    @pytest.fixture(autouse=True)
+    def _restore_optimizer_state(self, test_optimizer, capability_discovery):
+        """快照优化器的可变状态，测试结束后原地恢复，使共享的优化器在测试间互不影响"""
+        state = (
+            test_optimizer.performance_metrics,
+            test_optimizer.test_history,
+            test_optimizer.optimization_suggestions,
+        )
+        # 指标对象每次更新都会整体替换，但测试历史列表会被原地追加，需要深拷贝
+        snapshots = [copy.deepcopy(d) for d in state]
+        
+        yield
+        
+        for d, snapshot in zip(state, snapshots):
+            d.clear()
+            d.update(snapshot)
+        capability_discovery.reset()
+    
     def test_initialization(self, test_optimizer):
         """测试初始化"""
         assert test_optimizer is not None
@@ -96,68 +208,22 @@ class TestCapabilityTestOptimizer:
         assert test_optimizer.test_history == {}
     
     @pytest.mark.asyncio
-    async def test_optimize_test_suite_comprehensive(self, test_optimizer):
-        """测试全面测试策略"""
-        optimized_tests = await test_optimizer.optimize_test_suite(
-            "test_capability_1", "test_model_1", TestOptimizationStrategy.COMPREHENSIVE
-        )
-        
-        assert optimized_tests is not None
-        assert len(optimized_tests) > 0
-        assert len(optimized_tests) <= test_optimizer.config.max_test_cases_per_capability
+    async def test_optimize_test_suite(self, test_optimizer, strategy, expected, cap):
+        """测试各优化策略生成的测试套件"""
+        from src.core.capability_test_optimizer import TestOptimizationStrategy
         
-        # 检查是否包含基础测试和生成的测试
-        test_names = [test.name for test in optimized_tests]
-        assert "基础测试" in test_names
-        assert any("文本生成测试" in name for name in test_names)
-    
-    @pytest.mark.asyncio
-    async def test_optimize_test_suite_performance(self, test_optimizer):
-        """测试性能优先策略"""
         optimized_tests = await test_optimizer.optimize_test_suite(
-            "test_capability_1", "test_model_1", TestOptimizationStrategy.PERFORMANCE
+            "test_capability_1", "test_model_1", TestOptimizationStrategy(strategy)
         )
         
         assert optimized_tests is not None
-        assert len(optimized_tests) <= test_optimizer.config.max_test_cases_per_capability
+        assert 0 < len(optimized_tests) <= (cap or test_optimizer.config.max_test_cases_per_capability)
         
-        # 检查是否包含性能基准测试
+        # 检查是否保留基础测试，并包含策略对应的测试
         test_names = [test.name for test in optimized_tests]
-        assert "性能基准测试" in test_names
-    
-    @pytest.mark.asyncio
-    async def test_optimize_test_suite_cost_effective(self, test_optimizer):
-        """测试成本效益策略"""
-        optimized_tests = await test_optimizer.optimize_test_suite(
-            "test_capability_1", "test_model_1", TestOptimizationStrategy.COST_EFFECTIVE
-        )
-        
-        assert optimized_tests is not None
-        assert len(optimized_tests) <= test_optimizer.config.max_test_cases_per_capability
-        
-        # 检查是否包含成本效益测试
-        test_names = [test.name for test in optimized_tests]
-        assert "成本效益测试" in test_names
-    
-    @pytest.mark.asyncio
-    async def test_optimize_test_suite_minimal(self, test_optimizer):
-        """测试最小化策略"""
-        optimized_tests = await test_optimizer.optimize_test_suite(
-            "test_capability_1", "test_model_1", TestOptimizationStrategy.MINIMAL
-        )
-        
-        assert optimized_tests is not None
-        assert len(optimized_tests) <= 1  # 最小化策略应该只有1个测试
-    
-    @pytest.mark.asyncio
-    async def test_optimize_test_suite_adaptive(self, test_optimizer):
-        """测试自适应策略"""
-        optimized_tests = await test_optimizer.optimize_test_suite(
-            "test_capability_1", "test_model_1", TestOptimizationStrategy.ADAPTIVE
-        )
-        
-        assert optimized_tests is not None
-        assert len(optimized_tests) <= test_optimizer.config.max_test_cases_per_capability
+        assert "基础测试" in test_names
+        if expected is not None:
+            assert any(expected in name for name in test_names)
     
     @pytest.mark.asyncio
     async def test_optimize_test_suite_invalid_capability(self, test_optimizer):
@@ -171,18 +237,7 @@ class TestCapabilityTestOptimizer:
     @pytest.mark.asyncio
     async def test_run_optimized_tests(self, test_optimizer, capability_discovery):
         """测试运行优化测试"""
-        # 模拟测试结果
-        mock_result = CapabilityTestResult(
-            test_id="test_1",
-            capability_id="test_capability_1",
-            model_id="test_model_1",
-            result=TestResult.PASSED,
-            actual_output={"generated_text": "测试回复"},
-            error_message=None,
-            execution_time=100.0,
-            timestamp=time.time()
-        )
-        capability_discovery.test_capability_on_model.return_value = mock_result
+        capability_discovery.set_return(BASE_RESULT)
         
         # 运行优化测试
         batch_result = await test_optimizer.run_optimized_tests(
@@ -195,6 +250,7 @@ class TestCapabilityTestOptimizer:
         assert batch_result.model_id == "test_model_1"
         assert batch_result.total_tests > 0
         assert batch_result.successful_tests > 0
+        assert len(capability_discovery._calls) == batch_result.total_tests
         assert batch_result.avg_response_time > 0
         assert len(batch_result.test_results) > 0
         assert len(batch_result.optimization_suggestions) >= 0
@@ -202,83 +258,41 @@ class TestCapabilityTestOptimizer:
     @pytest.mark.asyncio
     async def test_run_optimized_tests_with_failures(self, test_optimizer, capability_discovery):
         """测试运行优化测试（包含失败）"""
+        from src.core.capability_test_optimizer import TestOptimizationStrategy
+        
         # 模拟部分测试失败
-        def mock_test_result(test_id):
-            if "performance" in test_id:
-                return CapabilityTestResult(
-                    test_id=test_id,
-                    capability_id="test_capability_1",
-                    model_id="test_model_1",
-                    result=TestResult.FAILED,
-                    actual_output={},
-                    error_message="超时错误",
-                    execution_time=200.0,
-                    timestamp=time.time()
-                )
-            else:
-                return CapabilityTestResult(
-                    test_id=test_id,
-                    capability_id="test_capability_1",
-                    model_id="test_model_1",
-                    result=TestResult.PASSED,
-                    actual_output={"generated_text": "测试回复"},
-                    error_message=None,
-                    execution_time=100.0,
-                    timestamp=time.time()
-                )
+        def mock_test_result(capability_id, model_id, test):
+            return _FAIL_RESULT if "performance" in test.test_id else BASE_RESULT
         
-        capability_discovery.test_capability_on_model.side_effect = mock_test_result
+        capability_discovery.set_side_effect(mock_test_result)
         
-        # 运行优化测试
+        # 运行优化测试（性能策略会生成性能基准测试）
         batch_result = await test_optimizer.run_optimized_tests(
-            "test_capability_1", "test_model_1"
+            "test_capability_1", "test_model_1", TestOptimizationStrategy.PERFORMANCE
         )
         
         assert batch_result is not None
         assert batch_result.failed_tests > 0
+        assert batch_result.successful_tests > 0
         assert len(batch_result.optimization_suggestions) > 0
     
-    def test_generate_optimization_suggestions(self, test_optimizer):
-        """测试生成优化建议"""
-        # 测试低成功率情况
+    @pytest.mark.parametrize("successful,failed,avg_rt,cost,expected_substr", [
+        (2, 8, 1000.0, 0.5, "成功率较低"),
+        (8, 2, 6000.0, 0.1, "响应时间较长"),
+        (8, 2, 1000.0, 2.0, "测试成本较高"),
+        (9, 1, 1500.0, 0.05, "性能表现良好"),
+    ], ids=["low_success_rate", "slow_response", "high_cost", "good_performance"])
+    def test_generate_optimization_suggestions(self, test_optimizer, successful, failed,
+                                               avg_rt, cost, expected_substr):
+        """测试各场景下生成的优化建议"""
         suggestions = test_optimizer._generate_optimization_suggestions(
             "test_capability_1", "test_model_1",
-            successful_tests=2, failed_tests=8,
-            avg_response_time=1000.0, total_cost=0.5, total_tests=10
+            successful_tests=successful, failed_tests=failed,
+            avg_response_time=avg_rt, total_cost=cost, total_tests=successful + failed
         )
         
         assert len(suggestions) > 0
-        assert any("成功率较低" in suggestion for suggestion in suggestions)
-        
-        # 测试高响应时间情况
-        suggestions = test_optimizer._generate_optimization_suggestions(
-            "test_capability_1", "test_model_1",
-            successful_tests=8, failed_tests=2,
-            avg_response_time=6000.0, total_cost=0.1, total_tests=10
-        )
-        
-        assert len(suggestions) > 0
-        assert any("响应时间较长" in suggestion for suggestion in suggestions)
-        
-        # 测试高成本情况
-        suggestions = test_optimizer._generate_optimization_suggestions(
-            "test_capability_1", "test_model_1",
-            successful_tests=8, failed_tests=2,
-            avg_response_time=1000.0, total_cost=2.0, total_tests=10
-        )
-        
-        assert len(suggestions) > 0
-        assert any("测试成本较高" in suggestion for suggestion in suggestions)
-        
-        # 测试良好性能情况
-        suggestions = test_optimizer._generate_optimization_suggestions(
-            "test_capability_1", "test_model_1",
-            successful_tests=9, failed_tests=1,
-            avg_response_time=1500.0, total_cost=0.05, total_tests=10
-        )
-        
-        assert len(suggestions) > 0
-        assert any("性能表现良好" in suggestion for suggestion in suggestions)
+        assert expected_substr in "\n".join(suggestions)
     
     def test_update_performance_metrics(self, test_optimizer):
         """测试更新性能指标"""
@@ -312,11 +326,44 @@ class TestCapabilityTestOptimizer:
         updated_metrics = test_optimizer.performance_metrics[metrics_key]
         assert updated_metrics.total_tests == 15
         assert updated_metrics.successful_tests == 13
-        assert updated_metrics.success_rate == pytest.approx(13/15, 0.01)
-        assert updated_metrics.avg_response_time == pytest.approx((1000*10 + 800*5)/15, 0.01)
+        assert updated_metrics.success_rate == pytest.approx(EXPECTED_SUCCESS_RATE, rel=0.01)
+        assert updated_metrics.avg_response_time == pytest.approx(EXPECTED_AVG_RT, rel=0.01)
         assert updated_metrics.total_cost == pytest.approx(0.15, 0.01)
         assert updated_metrics.avg_cost_per_test == pytest.approx(0.01, 0.01)
     
+    def test_batch_update_performance_metrics(self, test_optimizer):
+        """测试批量更新性能指标"""
+        test_optimizer._batch_update_performance_metrics([
+            ("test_capability_1", "test_model_1", 8, 2, 1000.0, 0.1, 10),
+            ("test_capability_2", "test_model_2", 5, 0, 800.0, 0.05, 5),
+            ("test_capability_1", "test_model_1", 5, 0, 800.0, 0.05, 5),
+        ])
+        
+        assert set(test_optimizer.performance_metrics) == {
+            "test_capability_1_test_model_1", "test_capability_2_test_model_2"
+        }
+        
+        metrics = test_optimizer.performance_metrics["test_capability_1_test_model_1"]
+        assert (metrics.total_tests, metrics.successful_tests) == (15, 13)
+        assert metrics.success_rate == pytest.approx(EXPECTED_SUCCESS_RATE, rel=0.01)
+        assert metrics.avg_response_time == pytest.approx(EXPECTED_AVG_RT, rel=0.01)
+        assert (metrics.min_response_time, metrics.max_response_time) == (800.0, 1000.0)
+        assert metrics.std_response_time == pytest.approx(94.28, rel=0.01)
+        assert metrics.total_cost == pytest.approx(0.15, rel=0.01)
+        assert metrics.avg_cost_per_test == pytest.approx(0.01, rel=0.01)
+        
+        # 再次批量更新时与已有指标合并
+        test_optimizer._batch_update_performance_metrics([
+            ("test_capability_2", "test_model_2", 0, 5, 1200.0, 0.05, 5),
+        ])
+        
+        metrics = test_optimizer.performance_metrics["test_capability_2_test_model_2"]
+        assert (metrics.total_tests, metrics.successful_tests) == (10, 5)
+        assert metrics.success_rate == 0.5
+        assert metrics.avg_response_time == pytest.approx(1000.0)
+        assert (metrics.min_response_time, metrics.max_response_time) == (800.0, 1200.0)
+        assert metrics.std_response_time == pytest.approx(200.0)
+    
     def test_get_performance_metrics(self, test_optimizer):
         """测试获取性能指标"""
         # 先更新指标
@@ -346,20 +393,7 @@ class TestCapabilityTestOptimizer:
         assert history == []
         
         # 添加测试历史
-        batch_result = TestBatchResult(
-            batch_id="test_batch_1",
-            capability_id="test_capability_1",
-            model_id="test_model_1",
-            total_tests=5,
-            successful_tests=4,
-            failed_tests=1,
-            avg_response_time=1000.0,
-            total_cost=0.05,
-            start_time=1000.0,
-            end_time=1100.0,
-            test_results=[],
-            optimization_suggestions=[]
-        )
+        batch_result = _make_batch_result()
         
         history_key = "test_capability_1_test_model_1"
         test_optimizer.test_history[history_key] = [batch_result]
@@ -372,40 +406,13 @@ class TestCapabilityTestOptimizer:
     def test_generate_test_report(self, test_optimizer):
         """测试生成测试报告"""
         # 创建测试结果
-        test_results = [
-            CapabilityTestResult(
-                test_id="test_1",
-                capability_id="test_capability_1",
-                model_id="test_model_1",
-                result=TestResult.PASSED,
-                actual_output={"generated_text": "回复1"},
-                error_message=None,
-                execution_time=100.0,
-                timestamp=time.time()
-            ),
-            CapabilityTestResult(
-                test_id="test_2",
-                capability_id="test_capability_1",
-                model_id="test_model_1",
-                result=TestResult.FAILED,
-                actual_output={},
-                error_message="超时错误",
-                execution_time=200.0,
-                timestamp=time.time()
-            )
-        ]
-        
-        batch_result = TestBatchResult(
-            batch_id="test_batch_1",
-            capability_id="test_capability_1",
-            model_id="test_model_1",
+        test_results = [BASE_RESULT, _FAIL_RESULT]
+        
+        batch_result = _make_batch_result(
             total_tests=2,
             successful_tests=1,
-            failed_tests=1,
             avg_response_time=150.0,
             total_cost=0.03,
-            start_time=1000.0,
-            end_time=1100.0,
             test_results=test_results,
             optimization_suggestions=["建议1", "建议2"]
         )
@@ -444,20 +451,7 @@ class TestCapabilityTestOptimizer:
         )
         
         # 添加测试历史
-        batch_result = TestBatchResult(
-            batch_id="test_batch_1",
-            capability_id="test_capability_1",
-            model_id="test_model_1",
-            total_tests=5,
-            successful_tests=4,
-            failed_tests=1,
-            avg_response_time=1000.0,
-            total_cost=0.05,
-            start_time=1000.0,
-            end_time=1100.0,
-            test_results=[],
-            optimization_suggestions=[]
-        )
+        batch_result = _make_batch_result()
         
         history_key = "test_capability_1_test_model_1"
         test_optimizer.test_history[history_key] = [batch_result]
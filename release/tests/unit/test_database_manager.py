@@ -5,361 +5,356 @@
 
 import pytest
 import sqlite3
-import tempfile
 import os
+import uuid
+import itertools
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
 from src.data.database_manager import DatabaseManager
 
 
+@pytest.fixture(scope="module")
+def shared_db(tmp_path_factory):
+    """创建模块内共享的已初始化数据库，表结构只创建一次（connect 时已启用WAL等PRAGMA）"""
+    db_manager = DatabaseManager(str(tmp_path_factory.mktemp("db") / "t.db"))
+    db_manager.connect()
+    db_manager.initialize_database()
+    yield db_manager
+    db_manager.disconnect()
+
+
+@pytest.fixture
+def db(shared_db):
+    """在保存点中运行测试，结束后回滚，使共享数据库在测试间保持隔离"""
+    shared_db.connection.execute("SAVEPOINT t")
+    yield shared_db
+    shared_db.connection.execute("ROLLBACK TO SAVEPOINT t")
+    shared_db.connection.execute("RELEASE SAVEPOINT t")
+
+
+@pytest.fixture
+def memory_db_uri():
+    """生成唯一的共享缓存内存数据库URI，同一URI的多个连接访问同一数据库"""
+    return f"file:test_integ_{uuid.uuid4().hex}?mode=memory&cache=shared"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """为需要独立连接生命周期或真实提交的测试提供数据库文件路径"""
+    return str(tmp_path / "test.db")
+
+
 class TestDatabaseManager:
     """测试数据库管理器类"""
     
-    def test_database_manager_initialization(self):
+    def test_database_manager_initialization(self, tmp_path):
         """测试数据库管理器初始化"""
-        # 使用临时文件进行测试
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
+        # 使用不存在的子目录，验证初始化时自动创建数据库目录
+        temp_db_path = str(tmp_path / "nested" / "test.db")
         
-        try:
-            # 测试正常初始化
-            db_manager = DatabaseManager(temp_db_path)
-            assert db_manager.db_path == temp_db_path
-            assert db_manager.connection is None
-            
-            # 测试数据库文件创建
-            assert os.path.exists(temp_db_path)
-            
-        finally:
-            # 清理临时文件
-            if os.path.exists(temp_db_path):
-                os.unlink(temp_db_path)
+        # 测试正常初始化
+        db_manager = DatabaseManager(temp_db_path)
+        assert db_manager.db_path == Path(temp_db_path)
+        assert db_manager.connection is None
+        
+        # 测试数据库目录创建
+        assert os.path.isdir(os.path.dirname(temp_db_path))
     
-    def test_database_manager_connection(self):
+    def test_database_manager_connection(self, db_path):
         """测试数据库连接管理"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
+        db_manager = DatabaseManager(db_path)
         
-        try:
-            db_manager = DatabaseManager(temp_db_path)
-            
-            # 测试连接建立
-            db_manager.connect()
-            assert db_manager.connection is not None
-            assert isinstance(db_manager.connection, sqlite3.Connection)
-            
-            # 测试重复连接
-            original_connection = db_manager.connection
-            db_manager.connect()  # 应该不会创建新连接
-            assert db_manager.connection is original_connection
-            
-            # 测试断开连接
-            db_manager.disconnect()
-            assert db_manager.connection is None
-            
-        finally:
-            if os.path.exists(temp_db_path):
-                os.unlink(temp_db_path)
+        # 测试连接建立
+        db_manager.connect()
+        assert db_manager.connection is not None
+        assert isinstance(db_manager.connection, sqlite3.Connection)
+        
+        # 测试重复连接
+        original_connection = db_manager.connection
+        db_manager.connect()  # 应该不会创建新连接
+        assert db_manager.connection is original_connection
+        
+        # 测试断开连接
+        db_manager.disconnect()
+        assert db_manager.connection is None
     
-    def test_database_manager_context_manager(self):
+    def test_database_manager_context_manager(self, db_path):
         """测试数据库管理器的上下文管理器"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
+        # 测试上下文管理器
+        with DatabaseManager(db_path) as db_manager:
+            assert db_manager.connection is not None
+            # 在上下文中应该可以执行查询
+            cursor = db_manager.connection.cursor()
+            cursor.execute("SELECT 1")
+            result = cursor.fetchone()
+            assert result == (1,)
         
+        # 离开上下文后连接应该关闭
+        assert db_manager.connection is None
+    
+    def test_database_manager_test_connection(self, db_path):
+        """测试连接可用性检查（未连接时自动建立连接）"""
+        db_manager = DatabaseManager(db_path)
         try:
-            # 测试上下文管理器
-            with DatabaseManager(temp_db_path) as db_manager:
-                assert db_manager.connection is not None
-                # 在上下文中应该可以执行查询
-                cursor = db_manager.connection.cursor()
-                cursor.execute("SELECT 1")
-                result = cursor.fetchone()
-                assert result == (1,)
-            
-            # 离开上下文后连接应该关闭
-            assert db_manager.connection is None
+            assert db_manager.test_connection() is True
+            assert db_manager.connection is not None
             
+            # 断开后再次检查会重新建立连接
+            db_manager.disconnect()
+            assert db_manager.test_connection() is True
         finally:
-            if os.path.exists(temp_db_path):
-                os.unlink(temp_db_path)
+            db_manager.disconnect()
+        
+        # 无法打开数据库时返回False而不是抛出异常
+        assert DatabaseManager(str(Path(db_path).parent)).test_connection() is False
     
-    def test_database_manager_table_creation(self):
+    def test_database_manager_table_creation(self, db):
         """测试数据库表创建"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
+        # 验证表是否存在
+        cursor = db.connection.cursor()
         
-        try:
-            with DatabaseManager(temp_db_path) as db_manager:
-                # 测试初始化表
-                db_manager.initialize_tables()
-                
-                # 验证表是否存在
-                cursor = db_manager.connection.cursor()
-                
-                # 检查核心表
-                tables_to_check = [
-                    'agents', 'agent_instances', 'capabilities', 
-                    'models', 'tasks', 'logs'
-                ]
-                
-                for table in tables_to_check:
-                    cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'")
-                    result = cursor.fetchone()
-                    assert result is not None, f"Table {table} should exist"
-                
-        finally:
-            if os.path.exists(temp_db_path):
-                os.unlink(temp_db_path)
+        # 检查核心表
+        tables_to_check = [
+            'agents', 'agent_instances', 'capabilities', 
+            'models', 'a2a_tasks', 'audit_logs'
+        ]
+        
+        # 一次查询取回所有待检查的表名
+        placeholders = ", ".join("?" * len(tables_to_check))
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE type='table' AND name IN ({placeholders})",
+            tables_to_check
+        )
+        names = {row[0] for row in cursor.fetchall()}
+        assert names == set(tables_to_check), f"Missing tables: {set(tables_to_check) - names}"
     
-    def test_database_manager_backup_restore(self):
+    def test_database_manager_foreign_key_indexes(self, db):
+        """测试按能力反查代理及其任务时，外键列均通过索引查找"""
+        plan = [row[3] for row in db.connection.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT a.name, t.task_id
+            FROM capabilities c
+            JOIN agent_capabilities ac ON ac.capability_id = c.id
+            JOIN agents a ON a.id = ac.agent_id
+            JOIN a2a_tasks t ON t.agent_id = a.id
+            WHERE c.id = ?
+        """, (1,))]
+        
+        assert not [step for step in plan if step.startswith("SCAN")], plan
+        assert any("idx_agent_caps_cap_id" in step for step in plan)
+        assert any("idx_a2a_tasks_agent_id" in step for step in plan)
+    
+    def test_database_manager_backup_restore(self, db_path, tmp_path):
         """测试数据库备份和恢复"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
+        backup_db_path = str(tmp_path / "test.backup.db")
         
-        with tempfile.NamedTemporaryFile(suffix='.backup.db', delete=False) as backup_db:
-            backup_db_path = backup_db.name
+        # 创建初始数据库
+        with DatabaseManager(db_path) as db_manager:
+            db_manager.initialize_database()
+            # 添加一些测试数据
+            cursor = db_manager.connection.cursor()
+            cursor.execute("INSERT INTO agents (name, description, agent_type) VALUES (?, ?, ?)", 
+                         ("Test Agent", "Test Description", "general"))
+            db_manager.connection.commit()
         
-        try:
-            # 创建初始数据库
-            with DatabaseManager(temp_db_path) as db_manager:
-                db_manager.initialize_tables()
-                # 添加一些测试数据
-                cursor = db_manager.connection.cursor()
-                cursor.execute("INSERT INTO agents (name, description, status) VALUES (?, ?, ?)", 
-                             ("Test Agent", "Test Description", "active"))
-                db_manager.connection.commit()
-            
-            # 测试备份
-            with DatabaseManager(temp_db_path) as db_manager:
+        # 测试备份
+        with DatabaseManager(db_path) as db_manager:
+            connection = Mock(wraps=db_manager.connection)
+            with patch.object(db_manager, "connection", connection):
                 success = db_manager.backup_database(backup_db_path)
-                assert success is True
-                assert os.path.exists(backup_db_path)
-            
-            # 测试恢复
-            with DatabaseManager(backup_db_path) as restored_db:
-                cursor = restored_db.connection.cursor()
-                cursor.execute("SELECT name, description, status FROM agents")
-                result = cursor.fetchone()
-                assert result == ("Test Agent", "Test Description", "active")
+            assert success is True
+            assert os.path.exists(backup_db_path)
             
-        finally:
-            for path in [temp_db_path, backup_db_path]:
-                if os.path.exists(path):
-                    os.unlink(path)
+            # 整库在一次 backup 调用中复制完成
+            connection.backup.assert_called_once()
+            assert connection.backup.call_args.kwargs.get("pages") == -1
+        
+        # 测试恢复
+        with DatabaseManager(backup_db_path) as restored_db:
+            cursor = restored_db.connection.cursor()
+            cursor.execute("SELECT name, description, agent_type FROM agents")
+            result = cursor.fetchone()
+            assert result == ("Test Agent", "Test Description", "general")
     
-    def test_database_manager_error_handling(self):
+    def test_database_manager_error_handling(self, db_path, tmp_path):
         """测试数据库错误处理"""
-        # 测试无效数据库路径
+        # 测试无效数据库路径（父路径是普通文件，无论运行用户权限如何都无法创建目录）
+        blocker = tmp_path / "not_a_directory"
+        blocker.touch()
         with pytest.raises(sqlite3.OperationalError):
-            db_manager = DatabaseManager("/invalid/path/database.db")
-            db_manager.connect()
+            DatabaseManager(str(blocker / "database.db")).connect()
         
         # 测试无效SQL查询
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
-        
-        try:
-            with DatabaseManager(temp_db_path) as db_manager:
-                db_manager.initialize_tables()
-                
-                # 测试无效查询
-                cursor = db_manager.connection.cursor()
-                with pytest.raises(sqlite3.OperationalError):
-                    cursor.execute("INVALID SQL STATEMENT")
-                
-        finally:
-            if os.path.exists(temp_db_path):
-                os.unlink(temp_db_path)
+        with DatabaseManager(db_path) as db_manager:
+            db_manager.initialize_database()
+            
+            # 测试无效查询
+            cursor = db_manager.connection.cursor()
+            with pytest.raises(sqlite3.OperationalError):
+                cursor.execute("INVALID SQL STATEMENT")
     
-    def test_database_manager_transaction_handling(self):
-        """测试数据库事务处理"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
-        
-        try:
-            with DatabaseManager(temp_db_path) as db_manager:
-                db_manager.initialize_tables()
-                
-                # 测试事务提交
-                cursor = db_manager.connection.cursor()
-                cursor.execute("INSERT INTO agents (name, description, status) VALUES (?, ?, ?)", 
-                             ("Agent 1", "Description 1", "active"))
-                db_manager.connection.commit()
-                
-                # 验证数据已提交
-                cursor.execute("SELECT name FROM agents WHERE name = ?", ("Agent 1",))
-                result = cursor.fetchone()
-                assert result is not None
-                
-                # 测试事务回滚
-                cursor.execute("INSERT INTO agents (name, description, status) VALUES (?, ?, ?)", 
-                             ("Agent 2", "Description 2", "active"))
-                db_manager.connection.rollback()
-                
-                # 验证数据未提交
-                cursor.execute("SELECT name FROM agents WHERE name = ?", ("Agent 2",))
-                result = cursor.fetchone()
-                assert result is None
-                
-        finally:
-            if os.path.exists(temp_db_path):
-                os.unlink(temp_db_path)
+    def test_database_manager_transaction_handling(self, db_path):
+        """测试数据库事务处理（需要真实提交，不使用共享数据库的保存点）"""
+        with DatabaseManager(db_path) as db_manager:
+            db_manager.initialize_database()
+            
+            # 测试事务提交
+            cursor = db_manager.connection.cursor()
+            cursor.execute("INSERT INTO agents (name, description, agent_type) VALUES (?, ?, ?)", 
+                         ("Agent 1", "Description 1", "general"))
+            db_manager.connection.commit()
+            
+            # 验证数据已提交
+            cursor.execute("SELECT name FROM agents WHERE name = ?", ("Agent 1",))
+            result = cursor.fetchone()
+            assert result is not None
+            
+            # 测试事务回滚
+            cursor.execute("INSERT INTO agents (name, description, agent_type) VALUES (?, ?, ?)", 
+                         ("Agent 2", "Description 2", "general"))
+            db_manager.connection.rollback()
+            
+            # 验证数据未提交
+            cursor.execute("SELECT name FROM agents WHERE name = ?", ("Agent 2",))
+            result = cursor.fetchone()
+            assert result is None
     
-    def test_database_manager_performance(self):
+    def test_database_manager_performance(self, db):
         """测试数据库性能"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
+        # 测试批量插入性能
+        cursor = db.connection.cursor()
         
-        try:
-            with DatabaseManager(temp_db_path) as db_manager:
-                db_manager.initialize_tables()
-                
-                # 测试批量插入性能
-                cursor = db_manager.connection.cursor()
-                
-                # 插入100条记录
-                test_data = [
-                    (f"Agent {i}", f"Description {i}", "active") 
-                    for i in range(100)
-                ]
-                
-                cursor.executemany(
-                    "INSERT INTO agents (name, description, status) VALUES (?, ?, ?)",
-                    test_data
-                )
-                db_manager.connection.commit()
-                
-                # 验证插入的数据
-                cursor.execute("SELECT COUNT(*) FROM agents")
-                count = cursor.fetchone()[0]
-                assert count == 100
-                
-                # 测试查询性能
-                cursor.execute("SELECT * FROM agents WHERE name LIKE 'Agent%'")
-                results = cursor.fetchall()
-                assert len(results) == 100
-                
-        finally:
-            if os.path.exists(temp_db_path):
-                os.unlink(temp_db_path)
+        # 插入100条记录（惰性生成，executemany 逐行消费，无需先构造完整列表）
+        test_data = zip(
+            map("Agent {}".format, range(100)),
+            map("Description {}".format, range(100)),
+            itertools.repeat("general", 100)
+        )
+        
+        # 在单个显式事务中批量插入，避免逐条隐式事务；
+        # 使用保存点而非BEGIN/COMMIT，可嵌套在 db 夹具的外层保存点中
+        insert_sql = "INSERT INTO agents (name, description, agent_type) VALUES (?, ?, ?)"
+        cursor.execute("SAVEPOINT batch_insert")
+        cursor.executemany(insert_sql, test_data)
+        
+        # 验证插入的数据（executemany 累计影响行数，需在执行下一条语句前读取）
+        assert cursor.rowcount == 100
+        cursor.execute("RELEASE SAVEPOINT batch_insert")
+        
+        # 测试查询性能（多取一行即可发现重复插入，无需读取全部匹配行）
+        cursor.execute("SELECT name FROM agents WHERE name LIKE 'Agent%' LIMIT 101")
+        results = cursor.fetchall()
+        assert len(results) == 100
 
 
 class TestDatabaseManagerIntegration:
     """测试数据库管理器集成功能"""
     
-    def test_database_manager_with_real_data(self):
+    def test_database_manager_with_real_data(self, memory_db_uri):
         """测试数据库管理器与真实数据"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
-        
-        try:
-            with DatabaseManager(temp_db_path) as db_manager:
-                # 初始化所有表
-                db_manager.initialize_tables()
-                
-                # 模拟完整的应用数据流
-                cursor = db_manager.connection.cursor()
-                
+        with DatabaseManager(memory_db_uri) as db_manager:
+            # 初始化所有表
+            db_manager.initialize_database()
+            
+            # 模拟完整的应用数据流
+            cursor = db_manager.connection.cursor()
+            
+            # 全新数据库中的主键可以预先确定，避免在插入之间读取 lastrowid
+            # （初始化时已插入几条基础能力，新能力使用远离它们的编号）
+            agent_id, capability_id, task_id = 1, 100, "task_translate_doc"
+            
+            # 所有插入在同一个事务中执行，成功时统一提交一次
+            with db_manager.connection:
                 # 1. 创建代理
                 cursor.execute("""
-                    INSERT INTO agents (name, description, agent_type, status, created_at, updated_at)
+                    INSERT INTO agents (id, name, description, agent_type, created_at, updated_at)
                     VALUES (?, ?, ?, ?, datetime('now'), datetime('now'))
-                """, ("Translation Agent", "Handles translation tasks", "translation", "active"))
-                
-                agent_id = cursor.lastrowid
+                """, (agent_id, "Translation Agent", "Handles translation tasks", "translation"))
                 
                 # 2. 创建能力
                 cursor.execute("""
-                    INSERT INTO capabilities (name, description, capability_type, parameters, output_type, status)
+                    INSERT INTO capabilities (id, name, category, description, test_script, expected_result)
                     VALUES (?, ?, ?, ?, ?, ?)
-                """, ("text_translation", "Translate text between languages", "translation", 
-                      '{"source_language": "str", "target_language": "str", "text": "str"}', 
-                      "str", "active"))
-                
-                capability_id = cursor.lastrowid
+                """, (capability_id, "text_translation", "text", "Translate text between languages",
+                      '{"source_language": "en", "target_language": "zh", "text": "hello"}', "你好"))
                 
                 # 3. 创建代理能力映射
                 cursor.execute("""
-                    INSERT INTO agent_capabilities (agent_id, capability_id, priority, enabled)
+                    INSERT INTO agent_capabilities (agent_id, capability_id, priority, is_required)
                     VALUES (?, ?, ?, ?)
                 """, (agent_id, capability_id, 1, 1))
                 
-                # 4. 创建任务
+                # 4. 创建分配给代理的任务
                 cursor.execute("""
-                    INSERT INTO tasks (name, description, task_type, status, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, datetime('now'), datetime('now'))
-                """, ("Translate document", "Translate English to Chinese", "translation", "pending"))
-                
-                task_id = cursor.lastrowid
-                
-                # 5. 创建任务分配
-                cursor.execute("""
-                    INSERT INTO task_assignments (task_id, agent_id, assigned_at, status)
-                    VALUES (?, ?, datetime('now'), ?)
-                """, (task_id, agent_id, "assigned"))
-                
-                db_manager.connection.commit()
-                
-                # 验证数据完整性
-                cursor.execute("""
-                    SELECT a.name, c.name, t.name, ta.status
-                    FROM agents a
-                    JOIN agent_capabilities ac ON a.id = ac.agent_id
-                    JOIN capabilities c ON ac.capability_id = c.id
-                    JOIN task_assignments ta ON a.id = ta.agent_id
-                    JOIN tasks t ON ta.task_id = t.id
-                    WHERE a.id = ?
-                """, (agent_id,))
-                
-                result = cursor.fetchone()
-                assert result is not None
-                assert result[0] == "Translation Agent"
-                assert result[1] == "text_translation"
-                assert result[2] == "Translate document"
-                assert result[3] == "assigned"
-                
-        finally:
-            if os.path.exists(temp_db_path):
-                os.unlink(temp_db_path)
+                    INSERT INTO a2a_tasks (task_id, agent_id, capability_id, input_data, status)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (task_id, agent_id, capability_id, '{"document": "report.txt"}', "assigned"))
+            
+            # 验证数据完整性
+            join_sql = """
+                SELECT a.name, c.name, t.task_id, t.status
+                FROM agents a
+                JOIN agent_capabilities ac ON a.id = ac.agent_id
+                JOIN capabilities c ON ac.capability_id = c.id
+                JOIN a2a_tasks t ON a.id = t.agent_id AND c.id = t.capability_id
+                WHERE a.id = ?
+            """
+            cursor.execute(join_sql, (agent_id,))
+            
+            result = cursor.fetchone()
+            assert result is not None
+            assert result[0] == "Translation Agent"
+            assert result[1] == "text_translation"
+            assert result[2] == task_id
+            assert result[3] == "assigned"
+            
+            # 关联查询的每一步都应通过主键或索引查找，不出现全表扫描
+            plan = [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {join_sql}", (agent_id,))]
+            assert not [step for step in plan if step.startswith("SCAN")], plan
+            assert any("idx_a2a_tasks_agent_id" in step for step in plan), plan
     
-    def test_database_manager_concurrent_access(self):
-        """测试数据库并发访问"""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_db:
-            temp_db_path = temp_db.name
+    def test_database_manager_concurrent_access(self, memory_db_uri):
+        """测试数据库并发访问（写连接与连接池中的读连接共享同一个内存数据库）"""
+        db_manager = DatabaseManager(memory_db_uri)
+        db_manager.connect()
+        db_manager.initialize_database()
         
         try:
-            # 创建第一个连接
-            db1 = DatabaseManager(temp_db_path)
-            db1.connect()
-            db1.initialize_tables()
+            # 从连接池取出两个读连接
+            pool = db_manager.get_pool(readers=2)
+            reader1 = pool.get_nowait()
+            reader2 = pool.get_nowait()
+            assert pool.empty()
             
-            # 创建第二个连接
-            db2 = DatabaseManager(temp_db_path)
-            db2.connect()
+            # 写连接插入数据
+            cursor = db_manager.connection.cursor()
+            cursor.execute("INSERT INTO agents (name, description, agent_type) VALUES (?, ?, ?)", 
+                          ("Agent from writer", "Description", "general"))
+            db_manager.connection.commit()
             
-            # 在两个连接上执行操作
-            cursor1 = db1.connection.cursor()
-            cursor2 = db2.connection.cursor()
-            
-            # 连接1插入数据
-            cursor1.execute("INSERT INTO agents (name, description, status) VALUES (?, ?, ?)", 
-                          ("Agent from DB1", "Description", "active"))
-            db1.connection.commit()
-            
-            # 连接2应该能看到数据
-            cursor2.execute("SELECT name FROM agents WHERE name = ?", ("Agent from DB1",))
-            result = cursor2.fetchone()
-            assert result is not None
-            assert result[0] == "Agent from DB1"
+            # 两个读连接都应该能看到数据
+            for reader in (reader1, reader2):
+                result = reader.execute("SELECT name FROM agents WHERE name = ?", 
+                                        ("Agent from writer",)).fetchone()
+                assert result is not None
+                assert result[0] == "Agent from writer"
             
-            # 清理
-            db1.disconnect()
-            db2.disconnect()
+            # 归还连接后再次获取连接池，复用同一批连接
+            pool.put_nowait(reader1)
+            pool.put_nowait(reader2)
+            assert db_manager.get_pool() is pool
+            assert pool.qsize() == 2
             
         finally:
-            if os.path.exists(temp_db_path):
-                os.unlink(temp_db_path)
+            # 清理（同时关闭连接池中的连接，最后一个连接关闭时内存数据库随之释放）
+            db_manager.disconnect()
+    
+    def test_database_manager_pool_rejects_private_memory_database(self):
+        """测试 ":memory:" 数据库不能创建连接池（读连接会各自打开空数据库）"""
+        with DatabaseManager(":memory:") as db_manager:
+            with pytest.raises(ValueError):
+                db_manager.get_pool()
 
 
 if __name__ == "__main__":
@@ -2,38 +2,52 @@
 调试工具测试
 """
 
-import os
-import sys
-import tempfile
-import unittest
-from unittest.mock import Mock, patch, MagicMock
+import copy
+import pickle
+import pytest
+from unittest.mock import Mock, MagicMock, patch, mock_open, create_autospec
 from datetime import datetime
 
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
-from src.ui.log_viewer import LogViewerWidget, LogEntry, LogLevel, LogParser
-from src.ui.debug_collector import DebugCollectorWidget, DebugInfoCollector, DebugInfoType
-from src.ui.performance_analyzer import PerformanceAnalyzerWidget, PerformanceAnalyzer, PerformanceIssue
-from src.ui.problem_diagnoser import ProblemDiagnoserWidget, ProblemDiagnoser, ProblemType
+from src.ui.log_viewer import LogEntry, LogLevel, LogParser
+from src.ui.debug_collector import DebugInfoCollector, DebugInfoType
+from src.ui.performance_analyzer import PerformanceAnalyzer, PerformanceIssue
+from src.ui.problem_diagnoser import ProblemDiagnoser, ProblemType
 from src.ui.debug_tools import DebugToolsWidget
 
 
-class TestLogViewer(unittest.TestCase):
+# 静态系统信息，替代 psutil 采样（cpu_percent(interval=1) 每次阻塞约1秒）
+_STATIC_SYSTEM_INFO = {
+    'platform': {'system': 'Linux', 'release': 'test', 'machine': 'x86_64'},
+    'cpu': {'physical_cores': 4, 'total_cores': 8, 'usage_percent': 10.0},
+    'memory': {'total': 8 * 1024 ** 3, 'available': 4 * 1024 ** 3, 'percent': 50.0},
+    'disk': {'total': 100 * 1024 ** 3, 'used': 40 * 1024 ** 3, 'percent': 40.0},
+    'network': {'bytes_sent': 0, 'bytes_recv': 0},
+    'process': {'name': 'python', 'memory_percent': 1.0, 'cpu_percent': 0.0, 'threads': 1}
+}
+
+
+@pytest.fixture(autouse=True)
+def _fast_sysinfo(request, monkeypatch):
+    """默认使用静态系统信息，标记为 slow 的测试访问真实系统"""
+    if request.node.get_closest_marker("slow"):
+        return
+    monkeypatch.setattr(
+        "src.ui.debug_collector.SystemInfoCollector.collect_system_info",
+        staticmethod(lambda: copy.deepcopy(_STATIC_SYSTEM_INFO))
+    )
+
+
+class TestLogViewer:
     """日志查看器测试"""
     
-    def setUp(self):
-        """测试前准备"""
-        self.log_viewer = LogViewerWidget()
-        
     def test_log_entry_creation(self):
         """测试日志条目创建"""
         timestamp = datetime.now()
         entry = LogEntry(timestamp, LogLevel.INFO, "test_logger", "测试消息")
         
-        self.assertEqual(entry.level, LogLevel.INFO)
-        self.assertEqual(entry.logger, "test_logger")
-        self.assertEqual(entry.message, "测试消息")
+        assert entry.level == LogLevel.INFO
+        assert entry.logger == "test_logger"
+        assert entry.message == "测试消息"
         
     def test_log_entry_to_dict(self):
         """测试日志条目转字典"""
@@ -41,9 +55,26 @@ class TestLogViewer(unittest.TestCase):
         entry = LogEntry(timestamp, LogLevel.ERROR, "test_logger", "错误消息")
         entry_dict = entry.to_dict()
         
-        self.assertEqual(entry_dict['level'], "ERROR")
-        self.assertEqual(entry_dict['logger'], "test_logger")
-        self.assertEqual(entry_dict['message'], "错误消息")
+        assert entry_dict['level'] == "ERROR"
+        assert entry_dict['logger'] == "test_logger"
+        assert entry_dict['message'] == "错误消息"
+        
+        # 转换结果被缓存，修改返回的字典不影响后续结果
+        entry_dict['message'] = "已修改"
+        assert entry.to_dict()['message'] == "错误消息"
+        assert LogEntry.from_dict(entry.to_dict()).level == LogLevel.ERROR
+        
+    def test_log_entry_immutable(self):
+        """测试日志条目不可修改且不携带实例字典"""
+        entry = LogEntry(datetime.now(), LogLevel.INFO, "test_logger", "测试消息")
+        
+        with pytest.raises(AttributeError):
+            entry.message = "新消息"
+        assert not hasattr(entry, '__dict__')
+        
+        # 复制和序列化通过构造函数重建条目
+        for clone in (copy.copy(entry), copy.deepcopy(entry), pickle.loads(pickle.dumps(entry))):
+            assert clone.to_dict() == entry.to_dict()
         
     def test_log_parser_parse_line(self):
         """测试日志解析器解析单行"""
@@ -51,19 +82,60 @@ class TestLogViewer(unittest.TestCase):
         line = "[2024-01-01 10:00:00] [INFO] [main] 这是一条测试日志"
         entry = LogParser.parse_log_line(line)
         
-        self.assertIsNotNone(entry)
-        self.assertEqual(entry.level, LogLevel.INFO)
-        self.assertEqual(entry.logger, "main")
-        self.assertEqual(entry.message, "这是一条测试日志")
+        assert entry is not None
+        assert entry.level == LogLevel.INFO
+        assert entry.logger == "main"
+        assert entry.message == "这是一条测试日志"
         
         # 测试JSON格式
         json_line = '{"timestamp": "2024-01-01T10:00:00", "level": "WARNING", "logger": "test", "message": "JSON日志"}'
         entry = LogParser.parse_log_line(json_line)
         
-        self.assertIsNotNone(entry)
-        self.assertEqual(entry.level, LogLevel.WARNING)
-        self.assertEqual(entry.logger, "test")
-        self.assertEqual(entry.message, "JSON日志")
+        assert entry is not None
+        assert entry.level == LogLevel.WARNING
+        assert entry.logger == "test"
+        assert entry.message == "JSON日志"
+        
+    def test_log_parser_parse_many(self):
+        """测试日志解析器批量解析多行文本"""
+        lines = []
+        for i in range(1000):
+            if i % 100 == 99:
+                lines.append("无法解析的行")
+            elif i % 2:
+                lines.append(f'{{"timestamp": "2024-01-01T10:00:00", "level": "WARNING", "logger": "json", "message": "JSON日志{i}"}}')
+            else:
+                lines.append(f"[2024-01-01 10:00:00] [ERROR] [main] 测试日志{i}")
+        text = "\n".join(lines)
+        
+        entries = LogParser.parse_many(text)
+        
+        # 无法解析的行被跳过，其余结果与逐行解析一致
+        assert len(entries) == 990
+        expected = [LogParser.parse_log_line(line) for line in lines]
+        expected = [entry for entry in expected if entry is not None]
+        assert [entry.to_dict() for entry in entries] == [entry.to_dict() for entry in expected]
+        assert entries[0].level == LogLevel.ERROR
+        assert entries[0].message == "测试日志0"
+        assert entries[1].logger == "json"
+        
+    def test_log_parser_parse_log_file(self, tmp_path):
+        """测试日志解析器解析日志文件"""
+        log_file = tmp_path / "app.log"
+        log_file.write_text(
+            "[2024-01-01 10:00:00] [INFO] [main] 启动\n"
+            "无法解析的行\n"
+            '  {"timestamp": "2024-01-01T10:00:01", "level": "ERROR", "logger": "db", "message": "连接失败"}  \n',
+            encoding="utf-8"
+        )
+        
+        entries = LogParser.parse_log_file(str(log_file))
+        
+        assert [(entry.level, entry.logger, entry.message) for entry in entries] == [
+            (LogLevel.INFO, "main", "启动"),
+            (LogLevel.ERROR, "db", "连接失败")
+        ]
+        assert LogParser.parse_log_file(str(tmp_path / "missing.log")) == []
         
     def test_log_filter_matches(self):
         """测试日志过滤器"""
@@ -76,17 +148,40 @@ class TestLogViewer(unittest.TestCase):
         error_entry = LogEntry(datetime.now(), LogLevel.ERROR, "test", "错误消息")
         info_entry = LogEntry(datetime.now(), LogLevel.INFO, "test", "信息消息")
         
-        self.assertTrue(filter_obj.matches(error_entry))
-        self.assertFalse(filter_obj.matches(info_entry))
+        assert filter_obj.matches(error_entry)
+        assert not filter_obj.matches(info_entry)
+        assert isinstance(filter_obj.levels, frozenset)
+        
+    def test_log_filter_matches_many(self):
+        """测试批量过滤结果与逐条过滤一致"""
+        from src.ui.log_viewer import LogFilter
+        
+        filter_obj = LogFilter()
+        filter_obj.levels = [LogLevel.WARNING, LogLevel.ERROR]
+        filter_obj.loggers = ["app"]
+        filter_obj.keywords = ["Timeout"]
+        filter_obj.regex_pattern = r"\d+ms"
+        
+        levels = list(LogLevel)
+        entries = [
+            LogEntry(datetime.now(), levels[i % len(levels)], "app" if i % 2 else "db",
+                     f"timeout after {i}ms" if i % 3 else "ok")
+            for i in range(60)
+        ]
+        
+        mask = filter_obj.matches_many(entries)
+        
+        assert mask == [filter_obj.matches(entry) for entry in entries]
+        assert any(mask) and not all(mask)
+        
+        # 无效正则被忽略，不影响其他条件
+        filter_obj.regex_pattern = "("
+        assert filter_obj.matches_many(entries[:5]) == [filter_obj.matches(e) for e in entries[:5]]
 
 
-class TestDebugCollector(unittest.TestCase):
+class TestDebugCollector:
     """调试信息收集器测试"""
     
-    def setUp(self):
-        """测试前准备"""
-        self.debug_collector = DebugCollectorWidget()
-        
     @patch('src.ui.debug_collector.SystemInfoCollector.collect_system_info')
     def test_system_info_collection(self, mock_collect):
         """测试系统信息收集"""
@@ -100,9 +195,20 @@ class TestDebugCollector(unittest.TestCase):
         collector = SystemInfoCollector()
         info = collector.collect_system_info()
         
-        self.assertIn('platform', info)
-        self.assertIn('cpu', info)
-        self.assertIn('memory', info)
+        assert 'platform' in info
+        assert 'cpu' in info
+        assert 'memory' in info
+        
+    @pytest.mark.slow
+    def test_system_info_collection_real(self):
+        """测试真实系统信息收集（包含CPU采样，耗时约1秒）"""
+        from src.ui.debug_collector import SystemInfoCollector
+        info = SystemInfoCollector.collect_system_info()
+        
+        assert info['platform']['system']
+        assert info['cpu']['total_cores'] >= 1
+        assert 0 <= info['memory']['percent'] <= 100
+        assert info['process']['threads'] >= 1
         
     def test_debug_info_collector(self):
         """测试调试信息收集器"""
@@ -110,21 +216,21 @@ class TestDebugCollector(unittest.TestCase):
         debug_infos = collector.collect_all_info()
         
         # 至少应该收集系统信息
-        self.assertTrue(len(debug_infos) > 0)
+        assert len(debug_infos) > 0
         
         # 检查信息类型
         info_types = [info.info_type for info in debug_infos]
-        self.assertIn(DebugInfoType.SYSTEM_INFO, info_types)
-        self.assertIn(DebugInfoType.APPLICATION_INFO, info_types)
+        assert DebugInfoType.SYSTEM_INFO in info_types
+        assert DebugInfoType.APPLICATION_INFO in info_types
+        
+        # 系统信息来自静态数据，不经过 psutil 采样
+        system_info = next(info for info in debug_infos if info.info_type == DebugInfoType.SYSTEM_INFO)
+        assert system_info.data == _STATIC_SYSTEM_INFO
 
 
-class TestPerformanceAnalyzer(unittest.TestCase):
+class TestPerformanceAnalyzer:
     """性能分析器测试"""
     
-    def setUp(self):
-        """测试前准备"""
-        self.performance_analyzer = PerformanceAnalyzerWidget()
-        
     def test_performance_issue_creation(self):
         """测试性能问题创建"""
         issue = PerformanceIssue(
@@ -136,9 +242,11 @@ class TestPerformanceAnalyzer(unittest.TestCase):
             metrics={'avg_response_time': 15.5}
         )
         
-        self.assertEqual(issue.severity, "high")
-        self.assertEqual(len(issue.affected_components), 2)
-        self.assertEqual(len(issue.recommendations), 2)
+        assert issue.severity == "high"
+        assert len(issue.affected_components) == 2
+        assert len(issue.recommendations) == 2
+        assert copy.copy(issue) == issue
+        assert pickle.loads(pickle.dumps(issue)) == issue
         
     def test_performance_analyzer(self):
         """测试性能分析器"""
@@ -150,112 +258,124 @@ class TestPerformanceAnalyzer(unittest.TestCase):
         
         # 应该检测到高响应时间问题
         high_response_issues = [issue for issue in issues if issue.issue_type == "high_response_time"]
-        self.assertTrue(len(high_response_issues) > 0)
+        assert len(high_response_issues) > 0
         
         # 测试正常指标
         normal_metrics = {'avg_response_time': 5.0, 'success_rate': 0.95}
         issues = analyzer.analyze_performance(normal_metrics)
         
         # 正常指标不应该产生问题
-        self.assertEqual(len(issues), 0)
+        assert len(issues) == 0
 
 
-class TestProblemDiagnoser(unittest.TestCase):
+class TestProblemDiagnoser:
     """问题诊断器测试"""
     
-    def setUp(self):
-        """测试前准备"""
-        self.problem_diagnoser = ProblemDiagnoserWidget()
-        
-    @patch('src.ui.problem_diagnoser.ConfigManager')
-    def test_configuration_diagnosis(self, mock_config_manager):
+    def test_configuration_diagnosis(self):
         """测试配置诊断"""
+        from src.core.config_manager import ConfigManager
+        from src.core.config_model import ConfigModel
         from src.ui.problem_diagnoser import ProblemDiagnoser
         
-        # 模拟配置问题
-        mock_config = Mock()
-        mock_config.database.path = ""
-        mock_config.logging.level = ""
-        mock_config.a2a_server.host = ""
-        mock_config.a2a_server.port = ""
-        
-        mock_config_manager.return_value.get_config.return_value = mock_config
-        
-        diagnoser = ProblemDiagnoser()
-        problem = diagnoser.diagnose_configuration()
-        
-        self.assertIsNotNone(problem)
-        self.assertEqual(problem.problem_type, ProblemType.CONFIGURATION_ERROR)
-        self.assertEqual(problem.severity, "high")
-        
-    @patch('src.ui.problem_diagnoser.DatabaseManager')
-    def test_connection_diagnosis(self, mock_db_manager):
+        # 模拟配置问题：按真实配置实例递归约束属性（spec_set），属性名写错时直接报错
+        mock_config = create_autospec(ConfigModel(), spec_set=True, instance=True)
+        mock_config.configure_mock(**{
+            "database.path": "",
+            "logging.level": "",
+            "a2a_server.host": "",
+            "a2a_server.port": ""
+        })
+        
+        # 按真实类约束属性，生产代码改名时测试会直接报错
+        mock_config_manager = MagicMock(spec=ConfigManager)
+        mock_config_manager.get_config.return_value = mock_config
+        
+        # 诊断方法在函数内导入，需要替换定义模块中的类
+        with patch('src.core.config_manager.ConfigManager', return_value=mock_config_manager):
+            diagnoser = ProblemDiagnoser()
+            problem = diagnoser.diagnose_configuration()
+        
+        assert problem is not None
+        assert problem.problem_type == ProblemType.CONFIGURATION_ERROR
+        assert problem.severity == "high"
+        assert len(problem.diagnostic_data['issues']) == 4
+        
+    def test_connection_diagnosis(self):
         """测试连接诊断"""
+        from src.data.database_manager import DatabaseManager
         from src.ui.problem_diagnoser import ProblemDiagnoser
         
         # 模拟连接失败
-        mock_db_instance = Mock()
+        mock_db_instance = MagicMock(spec=DatabaseManager)
         mock_db_instance.test_connection.return_value = False
         mock_db_instance.db_path = "/test/path.db"
-        mock_db_manager.return_value = mock_db_instance
         
-        diagnoser = ProblemDiagnoser()
-        problem = diagnoser.diagnose_connections()
+        with patch('src.data.database_manager.DatabaseManager', return_value=mock_db_instance):
+            diagnoser = ProblemDiagnoser()
+            problem = diagnoser.diagnose_connections()
         
-        self.assertIsNotNone(problem)
-        self.assertEqual(problem.problem_type, ProblemType.CONNECTION_ERROR)
-        self.assertEqual(problem.severity, "critical")
+        assert problem is not None
+        assert problem.problem_type == ProblemType.CONNECTION_ERROR
+        assert problem.severity == "critical"
+        assert problem.diagnostic_data == {'database_path': "/test/path.db"}
 
 
-class TestDebugToolsIntegration(unittest.TestCase):
+@pytest.mark.gui
+class TestDebugToolsIntegration:
     """调试工具集成测试"""
     
-    def setUp(self):
-        """测试前准备"""
-        self.debug_tools = DebugToolsWidget()
-        
-    def test_debug_tools_initialization(self):
+    @pytest.fixture(scope="class")
+    def debug_tools(self, app):
+        """创建调试工具界面（类内共享，测试通过 patch/monkeypatch 修改的状态会自动恢复）"""
+        return DebugToolsWidget()
+    
+    @pytest.fixture(autouse=True)
+    def _no_message_boxes(self, monkeypatch):
+        """屏蔽模态消息框，避免测试阻塞在对话框上"""
+        from PyQt6.QtWidgets import QMessageBox
+        for name in ('information', 'warning', 'critical'):
+            monkeypatch.setattr(QMessageBox, name, Mock())
+    
+    def test_debug_tools_initialization(self, debug_tools):
         """测试调试工具初始化"""
         # 检查所有组件是否已初始化
-        self.assertIsNotNone(self.debug_tools.log_viewer)
-        self.assertIsNotNone(self.debug_tools.debug_collector)
-        self.assertIsNotNone(self.debug_tools.performance_analyzer)
-        self.assertIsNotNone(self.debug_tools.problem_diagnoser)
+        assert debug_tools.log_viewer is not None
+        assert debug_tools.debug_collector is not None
+        assert debug_tools.performance_analyzer is not None
+        assert debug_tools.problem_diagnoser is not None
         
         # 检查标签页数量
-        self.assertEqual(self.debug_tools.tab_widget.count(), 4)
+        assert debug_tools.tab_widget.count() == 4
         
-    def test_quick_diagnose(self):
+    def test_quick_diagnose(self, debug_tools):
         """测试快速诊断"""
         # 模拟各个组件的诊断方法
-        with patch.object(self.debug_tools.problem_diagnoser, 'diagnose_problems') as mock_diagnose:
-            with patch.object(self.debug_tools.debug_collector, 'collect_debug_info') as mock_collect:
-                with patch.object(self.debug_tools.performance_analyzer, 'analyze_performance') as mock_analyze:
+        with patch.object(debug_tools.problem_diagnoser, 'diagnose_problems') as mock_diagnose:
+            with patch.object(debug_tools.debug_collector, 'collect_debug_info') as mock_collect:
+                with patch.object(debug_tools.performance_analyzer, 'analyze_performance') as mock_analyze:
                     
-                    self.debug_tools.quick_diagnose()
+                    debug_tools.quick_diagnose()
                     
                     # 验证所有方法都被调用
                     mock_diagnose.assert_called_once()
                     mock_collect.assert_called_once()
                     mock_analyze.assert_called_once()
                     
-    def test_export_all_reports(self):
+    def test_export_all_reports(self, debug_tools, monkeypatch):
         """测试导出所有报告"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            with patch('src.ui.debug_tools.os.makedirs') as mock_makedirs:
-                with patch('builtins.open', unittest.mock.mock_open()) as mock_open:
-                    
-                    # 模拟各个组件有数据
-                    self.debug_tools.problem_diagnoser.current_problems = [Mock()]
-                    self.debug_tools.performance_analyzer.current_issues = [Mock()]
-                    self.debug_tools.debug_collector.collected_info = [Mock()]
-                    
-                    self.debug_tools.export_all_reports()
-                    
-                    # 验证目录创建和文件写入
-                    mock_makedirs.assert_called_once()
-                    self.assertTrue(mock_open.called)
+        # 模拟各个组件有数据（monkeypatch 在测试结束后恢复共享界面的状态）
+        monkeypatch.setattr(debug_tools.problem_diagnoser, 'current_problems', [Mock()])
+        monkeypatch.setattr(debug_tools.performance_analyzer, 'current_issues', [Mock()])
+        monkeypatch.setattr(debug_tools.debug_collector, 'collected_info', [Mock()])
+        
+        with patch('src.ui.debug_tools.os.makedirs') as mock_makedirs:
+            with patch('builtins.open', mock_open()) as mocked_open:
+                debug_tools.export_all_reports()
+                
+                # 验证目录创建和文件写入
+                mock_makedirs.assert_called_once()
+                assert mocked_open.called
 
 
-if __name__ == '__main__':
-    unittest.main()
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
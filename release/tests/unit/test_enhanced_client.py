@@ -10,7 +10,7 @@ from typing import Dict, Any
 from datetime import datetime
 
 from src.a2a.enhanced_client import (
-    EnhancedA2AClient, ConnectionStatus, MessagePriority, MessageQueueItem,
+    EnhancedA2AClient, ConnectionStatus, MessagePriority, MessageQueueItem, MessageQueue,
     ConnectionStats, get_a2a_client, start_a2a_client, stop_a2a_client
 )
 from src.core.agent_communication import AgentMessage, MessageType
@@ -134,6 +134,9 @@ class TestEnhancedA2AClient:
         assert response is not None
         assert response.message_id == "response_message"
         assert response.message_type == MessageType.TASK_RESULT
+        
+        # 响应到达后等待记录已移除
+        assert sample_message.message_id not in a2a_client.pending_responses
     
     @pytest.mark.asyncio
     async def test_send_message_and_wait_timeout(self, a2a_client, sample_message):
@@ -147,6 +150,7 @@ class TestEnhancedA2AClient:
         response = await a2a_client.send_message_and_wait(sample_message, timeout=0.1)
         
         assert response is None
+        assert a2a_client.pending_responses == {}
     
     @pytest.mark.asyncio
     async def test_receive_message(self, a2a_client, sample_message):
@@ -195,38 +199,47 @@ class TestEnhancedA2AClient:
         # 接收响应消息
         await a2a_client.receive_message(response_message)
         
-        # 验证future已完成
+        # 验证future已完成并移出等待列表
         assert response_future.done()
         assert response_future.result() == response_message
+        assert "original_message" not in a2a_client.pending_responses
     
     @pytest.mark.asyncio
     async def test_message_processing_loop(self, a2a_client):
-        """测试消息处理循环"""
+        """测试消息处理循环（一次迭代处理整批已排队的消息）"""
         # 先连接
         with patch.object(a2a_client, '_message_processing_loop'), \
              patch.object(a2a_client, '_heartbeat_loop'):
             await a2a_client.connect()
         
-        # 添加消息到队列
-        message = AgentMessage(
-            message_id="test_message",
-            message_type=MessageType.TASK_REQUEST,
-            sender_id="test_sender",
-            receiver_id="test_receiver"
-        )
-        
-        queue_item = MessageQueueItem(
-            message=message,
-            priority=MessagePriority.NORMAL,
-            timestamp=datetime.now()
-        )
+        def stop_loop(message):
+            # 第一条消息处理后即断开，循环只会再执行完当前这一批
+            a2a_client.connection_status = ConnectionStatus.DISCONNECTED
         
-        await a2a_client.message_queue.put((MessagePriority.NORMAL.value, queue_item))
+        # 添加消息到队列
+        message_count = 5
+        for i in range(message_count):
+            message = AgentMessage(
+                message_id=f"test_message_{i}",
+                message_type=MessageType.TASK_REQUEST,
+                sender_id="test_sender",
+                receiver_id="test_receiver"
+            )
+            
+            queue_item = MessageQueueItem(
+                message=message,
+                priority=MessagePriority.NORMAL,
+                timestamp=datetime.now(),
+                callback=stop_loop if i == 0 else None
+            )
+            
+            a2a_client.message_queue.put_nowait((MessagePriority.NORMAL.value, queue_item))
         
-        # 处理消息
-        await a2a_client._process_message_queue_item(queue_item)
+        # 运行处理循环，第一批处理完后循环退出
+        await asyncio.wait_for(a2a_client._message_processing_loop(), timeout=1)
         
-        assert a2a_client.connection_stats.total_messages_sent == 1
+        assert a2a_client.connection_stats.total_messages_sent == message_count
+        assert a2a_client.get_queue_size() == 0
     
     @pytest.mark.asyncio
     async def test_message_retry(self, a2a_client):
@@ -380,6 +393,48 @@ class TestEnhancedA2AClient:
         assert status == ConnectionStatus.DISCONNECTED
 
 
+class TestMessageQueue:
+    """消息优先级队列测试"""
+    
+    @staticmethod
+    def _make_item(message_id: str, priority: MessagePriority) -> MessageQueueItem:
+        """创建消息队列项"""
+        message = AgentMessage(
+            message_id=message_id,
+            message_type=MessageType.TASK_REQUEST,
+            sender_id="test_sender",
+            receiver_id="test_receiver"
+        )
+        return MessageQueueItem(message=message, priority=priority, timestamp=datetime.now())
+    
+    def test_same_priority_is_fifo(self):
+        """测试同优先级按入队顺序出队（消息队列项本身不可比较）"""
+        queue = MessageQueue()
+        for i in range(5):
+            queue.put_nowait((MessagePriority.NORMAL.value, self._make_item(f"msg_{i}", MessagePriority.NORMAL)))
+        
+        order = [queue.get_nowait()[1].message.message_id for _ in range(5)]
+        
+        assert order == [f"msg_{i}" for i in range(5)]
+        assert queue.empty()
+        with pytest.raises(asyncio.QueueEmpty):
+            queue.get_nowait()
+    
+    @pytest.mark.asyncio
+    async def test_get_waits_for_put(self):
+        """测试空队列上的 get 等待到入队后返回"""
+        queue = MessageQueue()
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not getter.done()
+        
+        item = self._make_item("late_message", MessagePriority.URGENT)
+        queue.put_nowait((MessagePriority.URGENT.value, item))
+        
+        assert await asyncio.wait_for(getter, timeout=1) == (MessagePriority.URGENT.value, item)
+        assert queue.qsize() == 0
+
+
 class TestGlobalFunctions:
     """全局函数测试"""
     
@@ -489,8 +544,14 @@ class TestIntegration:
         assert a2a_client.get_queue_size() == 2
         
         # 4. 验证优先级处理（高优先级应该先处理）
-        # 注意：实际优先级队列处理需要检查实现细节
-        # 这里主要验证消息已正确加入队列
+        priority, first_item = a2a_client.message_queue.get_nowait()
+        assert priority == MessagePriority.HIGH.value
+        assert first_item.message.message_id == "high_priority"
+        
+        priority, second_item = a2a_client.message_queue.get_nowait()
+        assert priority == MessagePriority.LOW.value
+        assert second_item.message.message_id == "low_priority"
+        assert a2a_client.get_queue_size() == 0
 
 
 # 运行测试
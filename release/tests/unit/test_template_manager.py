@@ -5,8 +5,6 @@
 
 import pytest
 import json
-import tempfile
-import os
 from pathlib import Path
 from unittest.mock import Mock, MagicMock, patch
 
@@ -131,34 +129,27 @@ class TestTemplateManager:
         assert len(results) > 0
         assert all(template.category == "test" for template in results)
     
-    def test_export_template(self, template_manager, sample_template_data):
+    def test_export_template(self, template_manager, sample_template_data, tmp_path):
         """测试导出模板"""
         # 创建自定义模板
         template = template_manager.create_template(**sample_template_data)
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            export_path = f.name
-        
-        try:
-            # 导出模板
-            success = template_manager.export_template(template.template_id, export_path)
-            
-            assert success is True
-            
-            # 验证导出的文件内容
-            with open(export_path, 'r', encoding='utf-8') as f:
-                exported_data = json.load(f)
-            
-            assert exported_data["name"] == template.name
-            assert exported_data["description"] == template.description
-            assert exported_data["agent_type"] == template.agent_type.value
-            
-        finally:
-            # 清理临时文件
-            if os.path.exists(export_path):
-                os.unlink(export_path)
+        export_path = tmp_path / "template.json"
+        
+        # 导出模板
+        success = template_manager.export_template(template.template_id, str(export_path))
+        
+        assert success is True
+        
+        # 验证导出的文件内容
+        with open(export_path, 'r', encoding='utf-8') as f:
+            exported_data = json.load(f)
+        
+        assert exported_data["name"] == template.name
+        assert exported_data["description"] == template.description
+        assert exported_data["agent_type"] == template.agent_type.value
     
-    def test_import_template(self, template_manager, sample_template_data):
+    def test_import_template(self, template_manager, sample_template_data, tmp_path):
         """测试导入模板"""
         # 创建模板数据文件
         template_data = {
@@ -180,26 +171,19 @@ class TestTemplateManager:
             "updated_at": "2024-01-01T00:00:00"
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f:
-            json.dump(template_data, f, ensure_ascii=False)
-            import_path = f.name
-        
-        try:
-            # 导入模板
-            imported_template = template_manager.import_template(import_path)
-            
-            assert imported_template is not None
-            assert imported_template.name == template_data["name"]
-            assert imported_template.description == template_data["description"]
-            assert imported_template.agent_type.value == template_data["agent_type"]
-            
-            # 验证模板已添加到自定义模板
-            assert imported_template.template_id in template_manager.custom_templates
-            
-        finally:
-            # 清理临时文件
-            if os.path.exists(import_path):
-                os.unlink(import_path)
+        import_path = tmp_path / "template.json"
+        import_path.write_text(json.dumps(template_data, ensure_ascii=False), encoding='utf-8')
+        
+        # 导入模板
+        imported_template = template_manager.import_template(str(import_path))
+        
+        assert imported_template is not None
+        assert imported_template.name == template_data["name"]
+        assert imported_template.description == template_data["description"]
+        assert imported_template.agent_type.value == template_data["agent_type"]
+        
+        # 验证模板已添加到自定义模板
+        assert imported_template.template_id in template_manager.custom_templates
     
     def test_duplicate_template(self, template_manager, sample_template_data):
         """测试复制模板"""
@@ -393,7 +377,7 @@ class TestTemplateIntegration:
         # 验证代理已注册
         assert agent_config.agent_id in agent_registry.agents
     
-    def test_template_management_workflow(self, template_manager, agent_registry):
+    def test_template_management_workflow(self, template_manager, agent_registry, tmp_path):
         """测试模板管理完整工作流"""
         # 1. 创建模板
         template_data = {
@@ -416,25 +400,19 @@ class TestTemplateIntegration:
         assert template is not None
         
         # 2. 导出模板
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            export_path = f.name
-        
-        try:
-            success = template_manager.export_template(template.template_id, export_path)
-            assert success is True
-            
-            # 3. 删除模板
-            success = template_manager.delete_template(template.template_id)
-            assert success is True
-            
-            # 4. 导入模板
-            imported_template = template_manager.import_template(export_path)
-            assert imported_template is not None
-            assert imported_template.name == template_data["name"]
-            
-        finally:
-            if os.path.exists(export_path):
-                os.unlink(export_path)
+        export_path = str(tmp_path / "template.json")
+        
+        success = template_manager.export_template(template.template_id, export_path)
+        assert success is True
+        
+        # 3. 删除模板
+        success = template_manager.delete_template(template.template_id)
+        assert success is True
+        
+        # 4. 导入模板
+        imported_template = template_manager.import_template(export_path)
+        assert imported_template is not None
+        assert imported_template.name == template_data["name"]
 
 
 # 运行测试
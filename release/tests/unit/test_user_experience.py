@@ -5,8 +5,6 @@
 
 import pytest
 import json
-import tempfile
-import os
 from unittest.mock import Mock, patch
 
 from src.ui.user_feedback_manager import (
@@ -23,32 +21,27 @@ from src.ui.user_feedback_manager import (
 class TestUserFeedbackManager:
     """用户反馈管理器测试"""
     
-    def setup_method(self):
-        """测试方法设置"""
-        # 创建临时文件用于测试
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
-        self.temp_file.close()
+    @pytest.fixture(autouse=True)
+    def _feedback_manager(self, tmp_path):
+        """创建使用临时反馈文件的用户反馈管理器（临时目录由pytest清理）"""
+        # 创建空的临时反馈文件
+        self.feedback_path = tmp_path / "feedback.json"
+        self.feedback_path.touch()
         
         # 创建用户反馈管理器实例
         self.feedback_manager = UserFeedbackManager()
-        self.feedback_manager.feedback_file = self.temp_file.name
+        self.feedback_manager.feedback_file = str(self.feedback_path)
         self.feedback_manager.feedback_data = []
     
-    def teardown_method(self):
-        """测试方法清理"""
-        # 删除临时文件
-        if os.path.exists(self.temp_file.name):
-            os.unlink(self.temp_file.name)
-    
     def test_user_feedback_manager_initialization(self):
         """测试用户反馈管理器初始化"""
         assert self.feedback_manager.feedback_data == []
-        assert self.feedback_manager.feedback_file == self.temp_file.name
+        assert self.feedback_manager.feedback_file == str(self.feedback_path)
     
     def test_load_feedback_empty_file(self):
         """测试加载空反馈文件"""
         # 确保文件存在但为空
-        with open(self.temp_file.name, 'w') as f:
+        with open(self.feedback_path, 'w') as f:
             f.write('')
         
         self.feedback_manager.load_feedback()
@@ -73,7 +66,7 @@ class TestUserFeedbackManager:
         ]
         
         # 写入测试数据
-        with open(self.temp_file.name, 'w', encoding='utf-8') as f:
+        with open(self.feedback_path, 'w', encoding='utf-8') as f:
             json.dump(test_data, f, ensure_ascii=False, indent=2)
         
         # 加载数据
@@ -104,7 +97,7 @@ class TestUserFeedbackManager:
         self.feedback_manager.save_feedback()
         
         # 验证文件内容
-        with open(self.temp_file.name, 'r', encoding='utf-8') as f:
+        with open(self.feedback_path, 'r', encoding='utf-8') as f:
             saved_data = json.load(f)
         
         assert len(saved_data) == 1